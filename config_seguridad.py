@@ -10,8 +10,28 @@ para el sistema de gestión de inventarios.
 import os
 import secrets
 import hashlib
+import hmac
 from typing import Dict, Any
 
+# Caracteres que hacen que una entrada no se considere segura
+_CARACTERES_PELIGROSOS = frozenset('<>"\'&;()|`$')
+
+# Traducciones de sanitizar_entrada, aplicadas en una sola pasada cada una
+_TABLA_CARACTERES_CONTROL = dict.fromkeys(range(32))
+# El escape se aplicaba reemplazando '&' al final, lo que volvía a escapar las
+# entidades anteriores ('<' -> '&amp;lt;'); la tabla conserva ese resultado
+_TABLA_ESCAPE_HTML = str.maketrans({
+    '<': '&amp;lt;',
+    '>': '&amp;gt;',
+    '"': '&amp;quot;',
+    "'": '&amp;#x27;',
+    '&': '&amp;',
+})
+
+def _digest_sha256(texto: str, salt: str) -> str:
+    """Calcula el SHA-256 en hexadecimal del texto combinado con el salt."""
+    return hashlib.sha256(f"{texto}{salt}".encode('utf-8')).hexdigest()
+
 class ConfiguracionSeguridad:
     """
     Clase para manejar configuraciones de seguridad del sistema.
@@ -84,14 +104,7 @@ class ConfiguracionSeguridad:
         if salt is None:
             salt = secrets.token_hex(16)
         
-        # Combinar texto y salt
-        texto_salt = f"{texto}{salt}"
-        
-        # Generar hash SHA-256
-        hash_obj = hashlib.sha256()
-        hash_obj.update(texto_salt.encode('utf-8'))
-        
-        return f"{hash_obj.hexdigest()}:{salt}"
+        return f"{_digest_sha256(texto, salt)}:{salt}"
     
     def verificar_hash(self, texto: str, hash_verificar: str) -> bool:
         """
@@ -106,11 +119,12 @@ class ConfiguracionSeguridad:
         """
         try:
             hash_original, salt = hash_verificar.split(':')
-            hash_calculado = self.hash_seguro(texto, salt)
-            hash_calc, _ = hash_calculado.split(':')
-            return hash_original == hash_calc
         except ValueError:
             return False
+        
+        # Comparación en tiempo constante para no filtrar cuántos caracteres coinciden
+        return hmac.compare_digest(hash_original.encode('utf-8'),
+                                   _digest_sha256(texto, salt).encode('ascii'))
     
     def validar_entrada_segura(self, entrada: str) -> bool:
         """
@@ -129,13 +143,8 @@ class ConfiguracionSeguridad:
         if len(entrada) > self.configuraciones['max_input_length']:
             return False
         
-        # Verificar caracteres peligrosos
-        caracteres_peligrosos = ['<', '>', '"', "'", '&', ';', '(', ')', '|', '`', '$']
-        for char in caracteres_peligrosos:
-            if char in entrada:
-                return False
-        
-        return True
+        # Verificar caracteres peligrosos en un solo recorrido de la entrada
+        return _CARACTERES_PELIGROSOS.isdisjoint(entrada)
     
     def sanitizar_entrada(self, entrada: str) -> str:
         """
@@ -150,27 +159,17 @@ class ConfiguracionSeguridad:
         if not isinstance(entrada, str):
             return str(entrada)
         
-        # Remover caracteres de control
-        entrada_sanitizada = ''.join(char for char in entrada if ord(char) >= 32)
-        
-        # Limitar longitud
         max_length = self.configuraciones['max_input_length']
-        if len(entrada_sanitizada) > max_length:
-            entrada_sanitizada = entrada_sanitizada[:max_length]
-        
-        # Escapar caracteres especiales
-        caracteres_especiales = {
-            '<': '&lt;',
-            '>': '&gt;',
-            '"': '&quot;',
-            "'": '&#x27;',
-            '&': '&amp;',
-        }
         
-        for char, escape in caracteres_especiales.items():
-            entrada_sanitizada = entrada_sanitizada.replace(char, escape)
+        # Remover caracteres de control y limitar longitud. Si los primeros max_length
+        # caracteres no tienen caracteres de control, son el resultado y no hace falta
+        # recorrer el resto de una entrada demasiado larga
+        entrada_sanitizada = entrada[:max_length].translate(_TABLA_CARACTERES_CONTROL)
+        if len(entrada_sanitizada) < max_length and len(entrada) > max_length:
+            entrada_sanitizada = entrada.translate(_TABLA_CARACTERES_CONTROL)[:max_length]
         
-        return entrada_sanitizada
+        # Escapar caracteres especiales
+        return entrada_sanitizada.translate(_TABLA_ESCAPE_HTML)
     
     def obtener_configuracion(self, clave: str, valor_default: Any = None) -> Any:
         """
@@ -1,8 +1,22 @@
 import json
 import os
-import logging
-from typing import List, Optional, Dict, Any
+from contextlib import contextmanager
+from itertools import chain
+from operator import attrgetter
+from typing import List, Optional, Dict, Tuple
 from producto import Producto
+from registro import configurar_logger
+
+_LOGGER = configurar_logger("inventario", 'inventario_errors.log')
+
+# Longitud de los fragmentos usados por el índice de búsqueda por nombre
+_TAMANO_NGRAMA = 3
+# Clave de ordenación por precio resuelta en C, sin una lambda por producto
+_PRECIO = attrgetter('precio')
+
+def _normalizar(texto) -> str:
+    """Forma indexada de un nombre o categoría; los valores no textuales del JSON se indexan como texto."""
+    return str(texto).casefold()
 
 class SecurityError(Exception):
     """Excepción personalizada para errores de seguridad."""
@@ -24,7 +38,17 @@ class Inventario:
             archivo_datos (str): Nombre del archivo para persistir los datos
         """
         self.productos: Dict[str, Producto] = {}
+        # Índices de búsqueda para evitar recorrer todo el inventario:
+        # categoría -> {id: producto}, categoría -> forma normalizada,
+        # id -> nombre normalizado y trigrama -> {id}
+        self._indice_categorias: Dict[str, Dict[str, Producto]] = {}
+        self._categorias_normalizadas: Dict[str, str] = {}
+        self._nombres_normalizados: Dict[str, str] = {}
+        self._indice_ngramas: Dict[str, Dict[str, None]] = {}
         self.archivo_datos = archivo_datos
+        # Lotes abiertos con lote() y si quedaron cambios sin guardar dentro de ellos
+        self._nivel_lote = 0
+        self._cambios_pendientes = False
         self.cargar_datos()
     
     def agregar_producto(self, producto: Producto) -> bool:
@@ -41,7 +65,8 @@ class Inventario:
             return False
         
         self.productos[producto.id] = producto
-        self.guardar_datos()
+        self._indexar_producto(producto)
+        self._persistir()
         return True
     
     def eliminar_producto(self, id_producto: str) -> bool:
@@ -54,11 +79,27 @@ class Inventario:
         Returns:
             bool: True si se eliminó exitosamente, False si no existe
         """
-        if id_producto not in self.productos:
+        producto = self.obtener_producto(id_producto)
+        if producto is None:
             return False
         
-        del self.productos[id_producto]
-        self.guardar_datos()
+        return self.eliminar_producto_encontrado(producto)
+    
+    def eliminar_producto_encontrado(self, producto: Producto) -> bool:
+        """
+        Elimina un producto ya obtenido del inventario sin volver a buscarlo por ID.
+        
+        Args:
+            producto (Producto): Producto a eliminar
+            
+        Returns:
+            bool: True si se eliminó exitosamente, False si no pertenece al inventario
+        """
+        if self.productos.pop(producto.id, None) is None:
+            return False
+        
+        self._desindexar_producto(producto)
+        self._persistir()
         return True
     
     def obtener_producto(self, id_producto: str) -> Optional[Producto]:
@@ -88,8 +129,21 @@ class Inventario:
         if producto is None:
             return False
         
+        return self.actualizar_stock_producto(producto, nueva_cantidad)
+    
+    def actualizar_stock_producto(self, producto: Producto, nueva_cantidad: int) -> bool:
+        """
+        Actualiza el stock de un producto ya obtenido sin volver a buscarlo por ID.
+        
+        Args:
+            producto (Producto): Producto a actualizar
+            nueva_cantidad (int): Nueva cantidad en stock
+            
+        Returns:
+            bool: True si se actualizó exitosamente
+        """
         producto.actualizar_stock(nueva_cantidad)
-        self.guardar_datos()
+        self._persistir()
         return True
     
     def actualizar_precio(self, id_producto: str, nuevo_precio: float) -> bool:
@@ -107,8 +161,21 @@ class Inventario:
         if producto is None:
             return False
         
+        return self.actualizar_precio_producto(producto, nuevo_precio)
+    
+    def actualizar_precio_producto(self, producto: Producto, nuevo_precio: float) -> bool:
+        """
+        Actualiza el precio de un producto ya obtenido sin volver a buscarlo por ID.
+        
+        Args:
+            producto (Producto): Producto a actualizar
+            nuevo_precio (float): Nuevo precio
+            
+        Returns:
+            bool: True si se actualizó exitosamente
+        """
         producto.actualizar_precio(nuevo_precio)
-        self.guardar_datos()
+        self._persistir()
         return True
     
     def buscar_por_nombre(self, nombre: str) -> List[Producto]:
@@ -121,9 +188,27 @@ class Inventario:
         Returns:
             List[Producto]: Lista de productos que coinciden
         """
-        nombre_lower = nombre.lower()
-        return [producto for producto in self.productos.values() 
-                if nombre_lower in producto.nombre.lower()]
+        nombre_lower = nombre.casefold()
+        
+        # Consultas más cortas que un trigrama: recorrer los nombres ya normalizados
+        if len(nombre_lower) < _TAMANO_NGRAMA:
+            return [self.productos[id_producto]
+                    for id_producto, nombre_normalizado in self._nombres_normalizados.items()
+                    if nombre_lower in nombre_normalizado]
+        
+        # Candidatos: productos que contienen todos los trigramas de la consulta
+        candidatos = []
+        for ngrama in self._ngramas(nombre_lower):
+            ids = self._indice_ngramas.get(ngrama)
+            if not ids:
+                return []
+            candidatos.append(ids)
+        candidatos.sort(key=len)
+        menor, resto = candidatos[0], candidatos[1:]
+        
+        return [self.productos[id_producto] for id_producto in menor
+                if all(id_producto in ids for ids in resto)
+                and nombre_lower in self._nombres_normalizados[id_producto]]
     
     def buscar_por_categoria(self, categoria: str) -> List[Producto]:
         """
@@ -135,9 +220,59 @@ class Inventario:
         Returns:
             List[Producto]: Lista de productos que coinciden
         """
-        categoria_lower = categoria.lower()
-        return [producto for producto in self.productos.values() 
-                if categoria_lower in producto.categoria.lower()]
+        categoria_lower = categoria.casefold()
+        categorias_normalizadas = self._categorias_normalizadas
+        return list(chain.from_iterable(
+            productos.values() for nombre_categoria, productos in self._indice_categorias.items()
+            if categoria_lower in categorias_normalizadas[nombre_categoria]
+        ))
+    
+    @staticmethod
+    def _ngramas(texto: str) -> set:
+        """Obtiene los trigramas distintos de un texto."""
+        return {texto[i:i + _TAMANO_NGRAMA] for i in range(len(texto) - _TAMANO_NGRAMA + 1)}
+    
+    def _indexar_producto(self, producto: Producto):
+        """Registra un producto en los índices de búsqueda."""
+        productos_categoria = self._indice_categorias.get(producto.categoria)
+        if productos_categoria is None:
+            productos_categoria = self._indice_categorias[producto.categoria] = {}
+            self._categorias_normalizadas[producto.categoria] = _normalizar(producto.categoria)
+        productos_categoria[producto.id] = producto
+        
+        nombre_normalizado = _normalizar(producto.nombre)
+        self._nombres_normalizados[producto.id] = nombre_normalizado
+        for ngrama in self._ngramas(nombre_normalizado):
+            self._indice_ngramas.setdefault(ngrama, {})[producto.id] = None
+    
+    def _desindexar_producto(self, producto: Producto):
+        """Quita un producto de los índices de búsqueda."""
+        productos_categoria = self._indice_categorias.get(producto.categoria)
+        if productos_categoria is not None:
+            productos_categoria.pop(producto.id, None)
+            if not productos_categoria:
+                del self._indice_categorias[producto.categoria]
+                del self._categorias_normalizadas[producto.categoria]
+        
+        nombre_normalizado = self._nombres_normalizados.pop(producto.id, None)
+        if nombre_normalizado is None:
+            return
+        
+        for ngrama in self._ngramas(nombre_normalizado):
+            ids = self._indice_ngramas.get(ngrama)
+            if ids is not None:
+                ids.pop(producto.id, None)
+                if not ids:
+                    del self._indice_ngramas[ngrama]
+    
+    def _reconstruir_indices(self):
+        """Reconstruye los índices de búsqueda a partir de los productos actuales."""
+        self._indice_categorias = {}
+        self._categorias_normalizadas = {}
+        self._nombres_normalizados = {}
+        self._indice_ngramas = {}
+        for producto in self.productos.values():
+            self._indexar_producto(producto)
     
     def obtener_todos_productos(self) -> List[Producto]:
         """
@@ -148,6 +283,20 @@ class Inventario:
         """
         return list(self.productos.values())
     
+    def formatear_productos(self, productos: Optional[List[Producto]] = None) -> str:
+        """
+        Formatea una lista de productos como un único bloque de texto, una línea por producto.
+        
+        Args:
+            productos (Optional[List[Producto]]): Productos a formatear; todos si es None
+            
+        Returns:
+            str: Productos formateados separados por saltos de línea
+        """
+        if productos is None:
+            productos = self.productos.values()
+        return "\n".join(map(str, productos))
+    
     def productos_bajo_stock(self, umbral: int = 10) -> List[Producto]:
         """
         Obtiene productos con stock bajo.
@@ -168,7 +317,7 @@ class Inventario:
         Returns:
             float: Valor total del inventario
         """
-        return sum(producto.calcular_valor_total() for producto in self.productos.values())
+        return sum(map(Producto.calcular_valor_total, self.productos.values()))
     
     def obtener_producto_mas_caro(self) -> Optional[Producto]:
         """
@@ -180,7 +329,7 @@ class Inventario:
         if not self.productos:
             return None
         
-        return max(self.productos.values(), key=lambda p: p.precio)
+        return max(self.productos.values(), key=_PRECIO)
     
     def obtener_producto_mas_barato(self) -> Optional[Producto]:
         """
@@ -192,7 +341,7 @@ class Inventario:
         if not self.productos:
             return None
         
-        return min(self.productos.values(), key=lambda p: p.precio)
+        return min(self.productos.values(), key=_PRECIO)
     
     def calcular_promedio_precios_por_categoria(self) -> Dict[str, float]:
         """
@@ -231,9 +380,7 @@ class Inventario:
         
         reporte = f"REPORTE DE PRODUCTOS BAJO STOCK (menor a {umbral} unidades)\n"
         reporte += "=" * 60 + "\n"
-        
-        for producto in productos_bajo:
-            reporte += f"{producto}\n"
+        reporte += self.formatear_productos(productos_bajo) + "\n"
         
         return reporte
     
@@ -264,14 +411,12 @@ class Inventario:
         if not self.productos:
             return "No hay productos en el inventario."
         
-        producto_mas_caro = self.obtener_producto_mas_caro()
-        producto_mas_barato = self.obtener_producto_mas_barato()
-        promedios_categoria = self.calcular_promedio_precios_por_categoria()
+        valor_total, producto_mas_caro, producto_mas_barato, promedios_categoria = self._resumir_productos()
         
         reporte = "ESTADÍSTICAS DEL INVENTARIO\n"
         reporte += "=" * 40 + "\n"
         reporte += f"Total de productos: {len(self.productos)}\n"
-        reporte += f"Valor total del inventario: ${self.calcular_valor_total_inventario():.2f}\n\n"
+        reporte += f"Valor total del inventario: ${valor_total:.2f}\n\n"
         
         reporte += "PRODUCTO MÁS CARO:\n"
         reporte += f"{producto_mas_caro}\n\n"
@@ -285,6 +430,69 @@ class Inventario:
         
         return reporte
     
+    def _resumir_productos(self) -> Tuple[float, Optional[Producto], Optional[Producto], Dict[str, float]]:
+        """
+        Recorre el inventario una sola vez para obtener los datos de las estadísticas.
+        
+        Returns:
+            Tuple: Valor total, producto más caro, producto más barato y
+                promedio de precios por categoría
+        """
+        valor_total = 0
+        producto_mas_caro = None
+        producto_mas_barato = None
+        precios_por_categoria: Dict[str, list] = {}
+        
+        for producto in self.productos.values():
+            precio = producto.precio
+            valor_total += producto.calcular_valor_total()
+            
+            if producto_mas_caro is None or precio > producto_mas_caro.precio:
+                producto_mas_caro = producto
+            if producto_mas_barato is None or precio < producto_mas_barato.precio:
+                producto_mas_barato = producto
+            
+            # Acumulado por categoría: [suma de precios, cantidad de productos]
+            acumulado = precios_por_categoria.get(producto.categoria)
+            if acumulado is None:
+                precios_por_categoria[producto.categoria] = [precio, 1]
+            else:
+                acumulado[0] += precio
+                acumulado[1] += 1
+        
+        promedios = {categoria: suma / total for categoria, (suma, total) in precios_por_categoria.items()}
+        return valor_total, producto_mas_caro, producto_mas_barato, promedios
+    
+    @contextmanager
+    def lote(self):
+        """
+        Agrupa varias operaciones en una sola escritura del archivo de datos.
+        
+        Dentro del bloque las operaciones modifican el inventario en memoria y
+        los datos se guardan una única vez al salir, incluso si ocurre una
+        excepción. Los bloques pueden anidarse; se guarda al cerrar el exterior.
+        
+        Ejemplo:
+            with inventario.lote():
+                for producto in productos:
+                    inventario.agregar_producto(producto)
+        """
+        self._nivel_lote += 1
+        try:
+            yield self
+        finally:
+            self._nivel_lote -= 1
+            if self._nivel_lote == 0 and self._cambios_pendientes:
+                self._cambios_pendientes = False
+                self.guardar_datos()
+    
+    def _persistir(self):
+        """Guarda los datos, o los marca como pendientes si hay un lote abierto."""
+        if self._nivel_lote:
+            self._cambios_pendientes = True
+        else:
+            self.guardar_datos()
+    
     def guardar_datos(self):
         """
         Guarda los datos del inventario en el archivo JSON de forma segura.
@@ -295,6 +503,9 @@ class Inventario:
         datos = {
             'productos': [producto.to_dict() for producto in self.productos.values()]
         }
+        # Serializar antes de abrir el archivo: se escribe de una vez y un error de
+        # serialización no deja el archivo truncado
+        contenido = json.dumps(datos, indent=2, ensure_ascii=False)
         
         try:
             # Crear directorio si no existe
@@ -304,7 +515,7 @@ class Inventario:
             
             # Escribir archivo con permisos seguros
             with open(archivo_seguro, 'w', encoding='utf-8') as archivo:
-                json.dump(datos, archivo, indent=2, ensure_ascii=False)
+                archivo.write(contenido)
             
             # Establecer permisos seguros
             os.chmod(archivo_seguro, 0o644)
@@ -332,8 +543,12 @@ class Inventario:
             if not os.access(archivo_seguro, os.R_OK):
                 raise PermissionError("Sin permisos de lectura para el archivo")
             
-            with open(archivo_seguro, 'r', encoding='utf-8') as archivo:
-                datos = json.load(archivo)
+            # Un archivo vacío equivale a un inventario vacío, sin pasar por el parser
+            if os.path.getsize(archivo_seguro) == 0:
+                datos = {}
+            else:
+                with open(archivo_seguro, 'r', encoding='utf-8') as archivo:
+                    datos = json.load(archivo)
             
             # Validar estructura de datos
             if not isinstance(datos, dict):
@@ -361,6 +576,8 @@ class Inventario:
             self._log_error_seguro("Error al cargar datos del inventario", e)
             print("Error: No se pudieron cargar los datos del inventario. Se iniciará con inventario vacío.")
             self.productos = {}
+        
+        self._reconstruir_indices()
     
     def _validar_ruta_archivo(self, ruta: str) -> str:
         """
@@ -409,18 +626,8 @@ class Inventario:
             mensaje: Mensaje descriptivo del error
             error: Excepción capturada
         """
-        # Configurar logging seguro
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('inventario_errors.log'),
-                logging.StreamHandler()
-            ]
-        )
-        
         # Log solo información segura
-        logging.error(f"{mensaje}: {type(error).__name__}")
+        _LOGGER.error("%s: %s", mensaje, type(error).__name__)
     
     def generar_analisis_completo_inventario(self, umbral_precio_alto: float = 100.0, 
                                            umbral_precio_bajo: float = 50.0,
@@ -688,10 +895,13 @@ class Inventario:
         if factor_alto <= 0 or factor_bajo <= 0:
             raise ValueError("Los factores deben ser positivos")
         
-        total = 0
+        # Acumular los precios de cada tramo y aplicar cada factor una sola vez
+        suma_alta = 0
+        suma_baja = 0
         for producto in self.productos.values():
-            if producto.precio > umbral_precio:
-                total += producto.precio * factor_alto
+            precio = producto.precio
+            if precio > umbral_precio:
+                suma_alta += precio
             else:
-                total += producto.precio * factor_bajo
-        return total
\ No newline at end of file
+                suma_baja += precio
+        return suma_alta * factor_alto + suma_baja * factor_bajo
\ No newline at end of file
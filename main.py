@@ -10,12 +10,194 @@ Autor: Sistema de Gestión de Inventarios
 Versión: 1.0
 """
 
+import math
 import os
+import re
+import shutil
+import string
+import subprocess
 import sys
-import logging
 from typing import Optional
 from producto import Producto
 from inventario import Inventario, SecurityError
+from registro import configurar_logger
+
+_LOGGER = configurar_logger("sistema_inventario", 'sistema_errors.log')
+
+# Comando para limpiar la pantalla (Windows: cls, Unix/Linux: clear), resuelto en el PATH una sola vez
+_NOMBRE_COMANDO_LIMPIAR = 'cls' if os.name == 'nt' else 'clear'
+_COMANDO_LIMPIAR_PANTALLA = [shutil.which(_NOMBRE_COMANDO_LIMPIAR) or _NOMBRE_COMANDO_LIMPIAR]
+
+# Secuencia ANSI que borra la pantalla y lleva el cursor al inicio
+_SECUENCIA_LIMPIAR_PANTALLA = "\x1b[2J\x1b[H"
+
+def _terminal_admite_ansi() -> bool:
+    """
+    Indica si la salida estándar es una terminal que interpreta secuencias ANSI.
+    
+    En Windows intenta activar el procesamiento de secuencias de terminal virtual
+    de la consola (Windows 10 o posterior).
+    """
+    if not sys.stdout.isatty():
+        return False
+    
+    if os.name == 'nt':
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            consola = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+            modo = ctypes.c_ulong()
+            if not kernel32.GetConsoleMode(consola, ctypes.byref(modo)):
+                return False
+            # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+            return bool(kernel32.SetConsoleMode(consola, modo.value | 0x0004))
+        except (AttributeError, OSError):
+            return False
+    
+    return os.environ.get('TERM', 'dumb') != 'dumb'
+
+# Conversión de la entrada según el tipo esperado en obtener_entrada
+def _float_finito(texto: str) -> float:
+    """Convierte a float rechazando resultados infinitos por desbordamiento (p. ej. '1e400')."""
+    valor = float(texto)
+    if not math.isfinite(valor):
+        raise ValueError(f"Valor no finito: {texto!r}")
+    return valor
+
+_CONVERTIDORES = {
+    str: str.strip,
+    int: int,
+    float: _float_finito,
+}
+
+# Tabla de str.translate que elimina los caracteres de control excepto \t, \n y \r
+_TABLA_CARACTERES_CONTROL = dict.fromkeys(
+    codigo for codigo in range(0x20) if codigo not in (0x09, 0x0a, 0x0d)
+)
+
+# Formatos numéricos aceptados; se comprueban antes de convertir para no
+# depender de ValueError en el caso habitual. Siguen la sintaxis de int() y
+# float(), incluidos los separadores '_' entre dígitos, salvo 'nan' e 'inf'
+# (los desbordamientos como '1e400' los rechaza _float_finito)
+_DIGITOS = r'\d(?:_?\d)*'
+_VALIDADORES_NUMERICOS = {
+    int: re.compile(rf'\s*[-+]?{_DIGITOS}\s*').fullmatch,
+    float: re.compile(
+        rf'\s*[-+]?(?:{_DIGITOS}(?:\.(?:{_DIGITOS})?)?|\.{_DIGITOS})(?:[eE][-+]?{_DIGITOS})?\s*'
+    ).fullmatch,
+}
+
+# Patrones peligrosos a detectar en las entradas de texto, compilados en una
+# sola alternancia para recorrer la entrada una vez
+_PATRONES_PELIGROSOS = (
+    r'<script.*?>.*?</script>',  # Scripts HTML
+    r'javascript:',              # JavaScript
+    r'vbscript:',               # VBScript
+    r'on\w+\s*=',              # Event handlers
+    r'data:text/html',         # Data URLs
+    r'file://',                 # File URLs
+    r'ftp://',                  # FTP URLs
+    r'\.\./',                   # Path traversal
+    r'\.\.\\',                  # Path traversal Windows
+    r'<iframe',                 # iFrames
+    r'<object',                 # Objects
+    r'<embed',                  # Embeds
+    r'<form',                   # Forms
+    r'<input',                  # Inputs
+    r'<meta',                   # Meta tags
+    r'<link',                   # Link tags
+    r'<style',                  # Style tags
+    r'expression\s*\(',         # CSS expressions
+    r'url\s*\(',                # CSS URLs
+    r'@import',                 # CSS imports
+    r'<.*?>',                   # HTML tags básicos
+)
+_PATRON_PELIGROSO = re.compile('|'.join(_PATRONES_PELIGROSOS), re.IGNORECASE)
+
+# Caracteres con los que no se puede formar ninguno de los patrones peligrosos;
+# un texto compuesto solo por ellos no necesita pasar por la expresión regular
+_CARACTERES_SEGUROS = frozenset(string.ascii_letters + string.digits + " -_.,")
+
+# Texto del menú principal, construido una sola vez
+_MENU_PRINCIPAL = "\n".join([
+    "=" * 60,
+    "           SISTEMA DE GESTIÓN DE INVENTARIOS",
+    "=" * 60,
+    "1. Agregar producto",
+    "2. Eliminar producto",
+    "3. Actualizar stock de producto",
+    "4. Actualizar precio de producto",
+    "5. Buscar producto por nombre",
+    "6. Buscar producto por categoría",
+    "7. Mostrar todos los productos",
+    "8. Reporte de productos bajo stock",
+    "9. Reporte de valor del inventario",
+    "10. Estadísticas del inventario",
+    "11. Configurar umbral de stock bajo",
+    "0. Salir",
+    "=" * 60,
+])
+
+# Separador de los listados de productos
+_SEPARADOR_LISTADO = "-" * 80
+
+# Opciones del menú principal y el método de SistemaInventario que atiende cada una
+_ACCIONES_MENU = {
+    1: 'agregar_producto',
+    2: 'eliminar_producto',
+    3: 'actualizar_stock',
+    4: 'actualizar_precio',
+    5: 'buscar_por_nombre',
+    6: 'buscar_por_categoria',
+    7: 'mostrar_todos_productos',
+    8: 'reporte_stock_bajo',
+    9: 'reporte_valor_inventario',
+    10: 'estadisticas_inventario',
+    11: 'configurar_umbral_stock',
+}
+
+# Productos escritos por cada llamada a sys.stdout.write en los listados
+_TAMANO_LOTE_LISTADO = 1000
+
+def _limpiar_texto(texto: str) -> str:
+    """Elimina los caracteres de control, salvo tabuladores y saltos de línea, y recorta el texto a 1000 caracteres."""
+    return texto.translate(_TABLA_CARACTERES_CONTROL)[:1000]
+
+def _es_texto_seguro(texto: str) -> bool:
+    """Indica si el texto no contiene ninguno de los patrones de _PATRON_PELIGROSO."""
+    if _CARACTERES_SEGUROS.issuperset(texto):
+        return True
+    
+    return _PATRON_PELIGROSO.search(texto) is None
+
+def _error_de_validacion(valor, minimo, maximo, longitud_minima, longitud_maxima) -> Optional[str]:
+    """
+    Aplica las validaciones de rango y longitud de obtener_entrada.
+    
+    Returns:
+        Optional[str]: Mensaje de la primera validación que falla, o None si el valor es válido
+    """
+    if minimo is not None and valor < minimo:
+        return f"Error: El valor debe ser mayor o igual a {minimo}."
+    
+    if maximo is not None and valor > maximo:
+        return f"Error: El valor debe ser menor o igual a {maximo}."
+    
+    if longitud_minima is None and longitud_maxima is None:
+        return None
+    
+    longitud = len(valor) if isinstance(valor, str) else len(str(valor))
+    
+    if longitud_minima is not None and longitud < longitud_minima:
+        return f"Error: El valor debe tener al menos {longitud_minima} caracteres."
+    
+    if longitud_maxima is not None and longitud > longitud_maxima:
+        return f"Error: El valor no puede tener más de {longitud_maxima} caracteres."
+    
+    return None
+
+# Respuestas aceptadas como confirmación afirmativa
+_RESPUESTAS_AFIRMATIVAS = frozenset({'s', 'si', 'sí', 'y', 'yes'})
 
 class SistemaInventario:
     """
@@ -26,46 +208,52 @@ class SistemaInventario:
         """Inicializa el sistema de inventarios."""
         self.inventario = Inventario()
         self.umbral_stock_bajo = 10
+        self._limpiar_con_ansi = _terminal_admite_ansi()
     
     def limpiar_pantalla(self):
         """Limpia la pantalla de la consola de forma segura."""
-        import subprocess
-        import shlex
+        if self._limpiar_con_ansi:
+            # Secuencia de escape: evita lanzar un proceso en cada iteración del menú
+            sys.stdout.write(_SECUENCIA_LIMPIAR_PANTALLA)
+            sys.stdout.flush()
+            return
         
         try:
-            if os.name == 'nt':
-                # Windows - usar subprocess de forma segura
-                subprocess.run(['cls'], shell=False, check=True)
-            else:
-                # Unix/Linux - usar subprocess de forma segura
-                subprocess.run(['clear'], shell=False, check=True)
+            # Usar subprocess de forma segura, sin shell
+            subprocess.run(_COMANDO_LIMPIAR_PANTALLA, shell=False, check=True)
         except (subprocess.CalledProcessError, FileNotFoundError):
             # Fallback seguro - solo imprimir líneas en blanco
             print('\n' * 50)
     
     def mostrar_menu_principal(self):
         """Muestra el menú principal del sistema."""
-        print("=" * 60)
-        print("           SISTEMA DE GESTIÓN DE INVENTARIOS")
-        print("=" * 60)
-        print("1. Agregar producto")
-        print("2. Eliminar producto")
-        print("3. Actualizar stock de producto")
-        print("4. Actualizar precio de producto")
-        print("5. Buscar producto por nombre")
-        print("6. Buscar producto por categoría")
-        print("7. Mostrar todos los productos")
-        print("8. Reporte de productos bajo stock")
-        print("9. Reporte de valor del inventario")
-        print("10. Estadísticas del inventario")
-        print("11. Configurar umbral de stock bajo")
-        print("0. Salir")
-        print("=" * 60)
+        print(_MENU_PRINCIPAL)
     
     def pausar(self):
         """Pausa la ejecución hasta que el usuario presione Enter."""
         input("\nPresione Enter para continuar...")
     
+    def mostrar_y_pausar(self, mensaje: str):
+        """
+        Muestra un mensaje al usuario y espera a que presione Enter.
+        
+        Args:
+            mensaje (str): Mensaje a mostrar
+        """
+        print(mensaje)
+        self.pausar()
+    
+    def _mostrar_productos(self, productos: list):
+        """
+        Escribe un listado de productos en la salida estándar por lotes.
+        
+        Args:
+            productos (list): Productos a mostrar
+        """
+        for inicio in range(0, len(productos), _TAMANO_LOTE_LISTADO):
+            lote = productos[inicio:inicio + _TAMANO_LOTE_LISTADO]
+            sys.stdout.write(self.inventario.formatear_productos(lote) + "\n")
+    
     def obtener_entrada(self, mensaje: str, tipo=str, validaciones=None) -> any:
         """
         Obtiene entrada del usuario con validación y sanitización de seguridad.
@@ -80,47 +268,42 @@ class SistemaInventario:
         """
         if validaciones is None:
             validaciones = {}
-            
+        
+        # Resolver una sola vez el conversor y los límites configurados
+        validar_formato = _VALIDADORES_NUMERICOS.get(tipo)
+        convertir = _CONVERTIDORES.get(tipo)
+        minimo = validaciones.get('minimo')
+        maximo = validaciones.get('maximo')
+        longitud_minima = validaciones.get('longitud_minima')
+        longitud_maxima = validaciones.get('longitud_maxima')
+        
         while True:
             try:
                 entrada = input(mensaje)
                 
                 # Sanitización de entrada
-                entrada_sanitizada = self._sanitizar_entrada(entrada)
+                entrada_sanitizada = _limpiar_texto(entrada)
+                
+                if validar_formato is not None and not validar_formato(entrada_sanitizada):
+                    print("Error: Por favor ingrese un valor válido.")
+                    continue
+                
+                valor = convertir(entrada_sanitizada) if convertir else entrada_sanitizada
                 
-                if tipo == str:
-                    valor = entrada_sanitizada.strip()
+                if tipo is str:
                     if not valor:
                         print("Error: No se puede ingresar un valor vacío.")
                         continue
                     
                     # Validación adicional de seguridad para strings
-                    if not self._validar_string_seguro(valor):
+                    if not _es_texto_seguro(valor):
                         print("Error: La entrada contiene caracteres no permitidos.")
                         continue
-                        
-                elif tipo == int:
-                    valor = int(entrada_sanitizada)
-                elif tipo == float:
-                    valor = float(entrada_sanitizada)
-                else:
-                    valor = entrada_sanitizada
                 
                 # Aplicar validaciones adicionales
-                if 'minimo' in validaciones and valor < validaciones['minimo']:
-                    print(f"Error: El valor debe ser mayor o igual a {validaciones['minimo']}.")
-                    continue
-                    
-                if 'maximo' in validaciones and valor > validaciones['maximo']:
-                    print(f"Error: El valor debe ser menor o igual a {validaciones['maximo']}.")
-                    continue
-                    
-                if 'longitud_minima' in validaciones and len(str(valor)) < validaciones['longitud_minima']:
-                    print(f"Error: El valor debe tener al menos {validaciones['longitud_minima']} caracteres.")
-                    continue
-                    
-                if 'longitud_maxima' in validaciones and len(str(valor)) > validaciones['longitud_maxima']:
-                    print(f"Error: El valor no puede tener más de {validaciones['longitud_maxima']} caracteres.")
+                error = _error_de_validacion(valor, minimo, maximo, longitud_minima, longitud_maxima)
+                if error is not None:
+                    print(error)
                     continue
                 
                 return valor
@@ -144,21 +327,7 @@ class SistemaInventario:
         if not isinstance(entrada, str):
             return str(entrada)
         
-        # Remover caracteres de control peligrosos
-        caracteres_peligrosos = ['\x00', '\x01', '\x02', '\x03', '\x04', '\x05', '\x06', '\x07', 
-                                '\x08', '\x0b', '\x0c', '\x0e', '\x0f', '\x10', '\x11', '\x12', 
-                                '\x13', '\x14', '\x15', '\x16', '\x17', '\x18', '\x19', '\x1a', 
-                                '\x1b', '\x1c', '\x1d', '\x1e', '\x1f']
-        
-        entrada_sanitizada = entrada
-        for char in caracteres_peligrosos:
-            entrada_sanitizada = entrada_sanitizada.replace(char, '')
-        
-        # Limitar longitud máxima
-        if len(entrada_sanitizada) > 1000:
-            entrada_sanitizada = entrada_sanitizada[:1000]
-        
-        return entrada_sanitizada
+        return _limpiar_texto(entrada)
     
     def _validar_string_seguro(self, texto: str) -> bool:
         """
@@ -173,39 +342,7 @@ class SistemaInventario:
         if not isinstance(texto, str):
             return False
         
-        # Patrones peligrosos a detectar
-        patrones_peligrosos = [
-            r'<script.*?>.*?</script>',  # Scripts HTML
-            r'javascript:',              # JavaScript
-            r'vbscript:',               # VBScript
-            r'on\w+\s*=',              # Event handlers
-            r'data:text/html',         # Data URLs
-            r'file://',                 # File URLs
-            r'ftp://',                  # FTP URLs
-            r'\.\./',                   # Path traversal
-            r'\.\.\\',                  # Path traversal Windows
-            r'<iframe',                 # iFrames
-            r'<object',                 # Objects
-            r'<embed',                  # Embeds
-            r'<form',                   # Forms
-            r'<input',                  # Inputs
-            r'<meta',                   # Meta tags
-            r'<link',                   # Link tags
-            r'<style',                  # Style tags
-            r'expression\s*\(',         # CSS expressions
-            r'url\s*\(',                # CSS URLs
-            r'@import',                 # CSS imports
-            r'<.*?>',                   # HTML tags básicos
-        ]
-        
-        import re
-        texto_lower = texto.lower()
-        
-        for patron in patrones_peligrosos:
-            if re.search(patron, texto_lower, re.IGNORECASE):
-                return False
-        
-        return True
+        return _es_texto_seguro(texto)
     
     def _log_error_seguro(self, mensaje: str, error: Exception):
         """
@@ -215,18 +352,8 @@ class SistemaInventario:
             mensaje: Mensaje descriptivo del error
             error: Excepción capturada
         """
-        # Configurar logging seguro
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('sistema_errors.log'),
-                logging.StreamHandler()
-            ]
-        )
-        
         # Log solo información segura
-        logging.error(f"{mensaje}: {type(error).__name__}")
+        _LOGGER.error("%s: %s", mensaje, type(error).__name__)
     
     def agregar_producto(self):
         """Permite agregar un nuevo producto al inventario."""
@@ -239,11 +366,11 @@ class SistemaInventario:
         })
         if id_producto is None:
             return
+        id_producto = sys.intern(id_producto)
         
         # Verificar si el ID ya existe
         if self.inventario.obtener_producto(id_producto):
-            print(f"Error: Ya existe un producto con ID '{id_producto}'.")
-            self.pausar()
+            self.mostrar_y_pausar(f"Error: Ya existe un producto con ID '{id_producto}'.")
             return
         
         # Validar nombre del producto
@@ -283,13 +410,13 @@ class SistemaInventario:
             producto = Producto(id_producto, nombre, categoria, precio, cantidad)
             
             if self.inventario.agregar_producto(producto):
-                print(f"\n✓ Producto '{nombre}' agregado exitosamente.")
+                mensaje = f"\n✓ Producto '{nombre}' agregado exitosamente."
             else:
-                print("\n✗ Error al agregar el producto.")
+                mensaje = "\n✗ Error al agregar el producto."
         except Exception as e:
-            print(f"\n✗ Error al crear el producto: {e}")
+            mensaje = f"\n✗ Error al crear el producto: {e}"
         
-        self.pausar()
+        self.mostrar_y_pausar(mensaje)
     
     def eliminar_producto(self):
         """Permite eliminar un producto del inventario."""
@@ -298,25 +425,25 @@ class SistemaInventario:
         id_producto = self.obtener_entrada("ID del producto a eliminar: ")
         if id_producto is None:
             return
+        id_producto = sys.intern(id_producto)
         
         producto = self.inventario.obtener_producto(id_producto)
         if not producto:
-            print(f"Error: No se encontró un producto con ID '{id_producto}'.")
-            self.pausar()
+            self.mostrar_y_pausar(f"Error: No se encontró un producto con ID '{id_producto}'.")
             return
         
         print(f"\nProducto encontrado: {producto}")
         confirmar = self.obtener_entrada("\n¿Está seguro de que desea eliminar este producto? (s/n): ")
         
-        if confirmar.lower() in ['s', 'si', 'sí', 'y', 'yes']:
-            if self.inventario.eliminar_producto(id_producto):
-                print(f"\n✓ Producto '{producto.nombre}' eliminado exitosamente.")
+        if confirmar is not None and confirmar.lower() in _RESPUESTAS_AFIRMATIVAS:
+            if self.inventario.eliminar_producto_encontrado(producto):
+                mensaje = f"\n✓ Producto '{producto.nombre}' eliminado exitosamente."
             else:
-                print("\n✗ Error al eliminar el producto.")
+                mensaje = "\n✗ Error al eliminar el producto."
         else:
-            print("Operación cancelada.")
+            mensaje = "Operación cancelada."
         
-        self.pausar()
+        self.mostrar_y_pausar(mensaje)
     
     def actualizar_stock(self):
         """Permite actualizar el stock de un producto."""
@@ -328,11 +455,11 @@ class SistemaInventario:
         })
         if id_producto is None:
             return
+        id_producto = sys.intern(id_producto)
         
         producto = self.inventario.obtener_producto(id_producto)
         if not producto:
-            print(f"Error: No se encontró un producto con ID '{id_producto}'.")
-            self.pausar()
+            self.mostrar_y_pausar(f"Error: No se encontró un producto con ID '{id_producto}'.")
             return
         
         print(f"\nProducto actual: {producto}")
@@ -344,14 +471,14 @@ class SistemaInventario:
             return
         
         try:
-            if self.inventario.actualizar_stock(id_producto, nueva_cantidad):
-                print(f"\n✓ Stock actualizado exitosamente a {nueva_cantidad} unidades.")
+            if self.inventario.actualizar_stock_producto(producto, nueva_cantidad):
+                mensaje = f"\n✓ Stock actualizado exitosamente a {nueva_cantidad} unidades."
             else:
-                print("\n✗ Error al actualizar el stock.")
+                mensaje = "\n✗ Error al actualizar el stock."
         except Exception as e:
-            print(f"\n✗ Error al actualizar el stock: {e}")
+            mensaje = f"\n✗ Error al actualizar el stock: {e}"
         
-        self.pausar()
+        self.mostrar_y_pausar(mensaje)
     
     def actualizar_precio(self):
         """Permite actualizar el precio de un producto."""
@@ -363,11 +490,11 @@ class SistemaInventario:
         })
         if id_producto is None:
             return
+        id_producto = sys.intern(id_producto)
         
         producto = self.inventario.obtener_producto(id_producto)
         if not producto:
-            print(f"Error: No se encontró un producto con ID '{id_producto}'.")
-            self.pausar()
+            self.mostrar_y_pausar(f"Error: No se encontró un producto con ID '{id_producto}'.")
             return
         
         print(f"\nProducto actual: {producto}")
@@ -379,14 +506,14 @@ class SistemaInventario:
             return
         
         try:
-            if self.inventario.actualizar_precio(id_producto, nuevo_precio):
-                print(f"\n✓ Precio actualizado exitosamente a ${nuevo_precio:.2f}.")
+            if self.inventario.actualizar_precio_producto(producto, nuevo_precio):
+                mensaje = f"\n✓ Precio actualizado exitosamente a ${nuevo_precio:.2f}."
             else:
-                print("\n✗ Error al actualizar el precio.")
+                mensaje = "\n✗ Error al actualizar el precio."
         except Exception as e:
-            print(f"\n✗ Error al actualizar el precio: {e}")
+            mensaje = f"\n✗ Error al actualizar el precio: {e}"
         
-        self.pausar()
+        self.mostrar_y_pausar(mensaje)
     
     def buscar_por_nombre(self):
         """Permite buscar productos por nombre."""
@@ -402,9 +529,8 @@ class SistemaInventario:
             print(f"\nNo se encontraron productos que contengan '{nombre}'.")
         else:
             print(f"\nProductos encontrados ({len(productos)}):")
-            print("-" * 80)
-            for producto in productos:
-                print(producto)
+            print(_SEPARADOR_LISTADO)
+            self._mostrar_productos(productos)
         
         self.pausar()
     
@@ -422,9 +548,8 @@ class SistemaInventario:
             print(f"\nNo se encontraron productos en la categoría '{categoria}'.")
         else:
             print(f"\nProductos encontrados ({len(productos)}):")
-            print("-" * 80)
-            for producto in productos:
-                print(producto)
+            print(_SEPARADOR_LISTADO)
+            self._mostrar_productos(productos)
         
         self.pausar()
     
@@ -438,9 +563,8 @@ class SistemaInventario:
             print("No hay productos en el inventario.")
         else:
             print(f"Total de productos: {len(productos)}")
-            print("-" * 80)
-            for producto in productos:
-                print(producto)
+            print(_SEPARADOR_LISTADO)
+            self._mostrar_productos(productos)
         
         self.pausar()
     
@@ -449,46 +573,35 @@ class SistemaInventario:
         print("\n--- REPORTE DE STOCK BAJO ---")
         
         reporte = self.inventario.generar_reporte_stock_bajo(self.umbral_stock_bajo)
-        print(reporte)
-        
-        self.pausar()
+        self.mostrar_y_pausar(reporte)
     
     def reporte_valor_inventario(self):
         """Muestra el reporte del valor del inventario."""
         print("\n--- REPORTE DE VALOR DEL INVENTARIO ---")
         
         reporte = self.inventario.generar_reporte_valor_inventario()
-        print(reporte)
-        
-        self.pausar()
+        self.mostrar_y_pausar(reporte)
     
     def estadisticas_inventario(self):
         """Muestra las estadísticas del inventario."""
         print("\n--- ESTADÍSTICAS DEL INVENTARIO ---")
         
         reporte = self.inventario.generar_estadisticas()
-        print(reporte)
-        
-        self.pausar()
+        self.mostrar_y_pausar(reporte)
     
     def configurar_umbral_stock(self):
         """Permite configurar el umbral para stock bajo."""
         print("\n--- CONFIGURAR UMBRAL DE STOCK BAJO ---")
         
         print(f"Umbral actual: {self.umbral_stock_bajo}")
-        nuevo_umbral = self.obtener_entrada("Nuevo umbral: ", int)
+        nuevo_umbral = self.obtener_entrada("Nuevo umbral: ", int, {
+            'minimo': 0
+        })
         if nuevo_umbral is None:
             return
         
-        if nuevo_umbral < 0:
-            print("Error: El umbral no puede ser negativo.")
-            self.pausar()
-            return
-        
         self.umbral_stock_bajo = nuevo_umbral
-        print(f"\n✓ Umbral de stock bajo actualizado a {nuevo_umbral}.")
-        
-        self.pausar()
+        self.mostrar_y_pausar(f"\n✓ Umbral de stock bajo actualizado a {nuevo_umbral}.")
     
     def _procesar_opcion_menu(self, opcion):
         """
@@ -503,31 +616,12 @@ class SistemaInventario:
         if opcion == 0:
             print("\n¡Gracias por usar el Sistema de Gestión de Inventarios!")
             return False
-        elif opcion == 1:
-            self.agregar_producto()
-        elif opcion == 2:
-            self.eliminar_producto()
-        elif opcion == 3:
-            self.actualizar_stock()
-        elif opcion == 4:
-            self.actualizar_precio()
-        elif opcion == 5:
-            self.buscar_por_nombre()
-        elif opcion == 6:
-            self.buscar_por_categoria()
-        elif opcion == 7:
-            self.mostrar_todos_productos()
-        elif opcion == 8:
-            self.reporte_stock_bajo()
-        elif opcion == 9:
-            self.reporte_valor_inventario()
-        elif opcion == 10:
-            self.estadisticas_inventario()
-        elif opcion == 11:
-            self.configurar_umbral_stock()
+        
+        accion = _ACCIONES_MENU.get(opcion)
+        if accion is None:
+            self.mostrar_y_pausar("Opción inválida. Por favor seleccione una opción del 0 al 11.")
         else:
-            print("Opción inválida. Por favor seleccione una opción del 0 al 11.")
-            self.pausar()
+            getattr(self, accion)()
         
         return True
 
@@ -545,20 +639,18 @@ class SistemaInventario:
                 if not self._procesar_opcion_menu(opcion):
                     break
                     
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
+                # EOFError: fin de la entrada estándar (p. ej. entrada redirigida desde un archivo)
                 print("\n\n¡Gracias por usar el Sistema de Gestión de Inventarios!")
                 break
             except (ValueError, TypeError, AttributeError) as e:
-                print(f"\nError de datos: {e}")
-                self.pausar()
+                self.mostrar_y_pausar(f"\nError de datos: {e}")
             except (OSError, IOError, PermissionError) as e:
-                print("\nError de sistema: No se pudo acceder a los archivos necesarios.")
-                self.pausar()
+                self.mostrar_y_pausar("\nError de sistema: No se pudo acceder a los archivos necesarios.")
             except Exception as e:
                 # Log del error sin exponer información sensible
                 self._log_error_seguro("Error inesperado en el sistema", e)
-                print("\nError inesperado del sistema. Contacte al administrador.")
-                self.pausar()
+                self.mostrar_y_pausar("\nError inesperado del sistema. Contacte al administrador.")
 
 def main():
     """Función principal del programa."""
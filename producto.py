@@ -1,5 +1,17 @@
+import sys
 from datetime import datetime
-from typing import Optional
+from operator import itemgetter
+
+def _internar(valor):
+    """Interna el valor si es exactamente un str; cualquier otro valor se guarda tal cual."""
+    # sys.intern rechaza subclases de str y valores no textuales (p. ej. un ID numérico en el JSON)
+    if type(valor) is str:
+        return sys.intern(valor)
+    return valor
+
+# Lectura de todos los campos de un producto serializado en una sola llamada
+_CAMPOS_PRODUCTO = itemgetter('id', 'nombre', 'categoria', 'precio', 'cantidad',
+                              'fecha_actualizacion')
 
 class Producto:
     """
@@ -14,6 +26,16 @@ class Producto:
         fecha_actualizacion (datetime): Fecha de última actualización
     """
     
+    # Atributos fijos: sin __dict__ por instancia, menos memoria y acceso más rápido
+    __slots__ = ('id', 'nombre', 'categoria', 'precio', 'cantidad', 'fecha_actualizacion',
+                 '_str_cache')
+    
+    # Plantilla de __str__ enlazada una sola vez a nivel de clase
+    # La fecha se arma con sus campos enteros en lugar de pasar por strftime
+    _FORMATO_STR = ("ID: {0} | {1} | {2} | Precio: ${3:.2f} | Stock: {4} | "
+                    "Última actualización: {5.year:04d}-{5.month:02d}-{5.day:02d} "
+                    "{5.hour:02d}:{5.minute:02d}").format
+    
     def __init__(self, id: str, nombre: str, categoria: str, precio: float, cantidad: int):
         """
         Inicializa un nuevo producto.
@@ -25,12 +47,16 @@ class Producto:
             precio (float): Precio del producto
             cantidad (int): Cantidad en stock
         """
-        self.id = id
+        # El ID se interna para que las búsquedas en el inventario comparen por identidad;
+        # las categorías se repiten entre productos y se internan para compartir una sola copia
+        self.id = _internar(id)
         self.nombre = nombre
-        self.categoria = categoria
+        self.categoria = _internar(categoria)
         self.precio = precio
         self.cantidad = cantidad
         self.fecha_actualizacion = datetime.now()
+        # Texto de __str__ ya formateado; se invalida al modificar el producto
+        self._str_cache = None
     
     def actualizar_stock(self, nueva_cantidad: int):
         """
@@ -41,6 +67,7 @@ class Producto:
         """
         self.cantidad = nueva_cantidad
         self.fecha_actualizacion = datetime.now()
+        self._str_cache = None
     
     def actualizar_precio(self, nuevo_precio: float):
         """
@@ -51,6 +78,7 @@ class Producto:
         """
         self.precio = nuevo_precio
         self.fecha_actualizacion = datetime.now()
+        self._str_cache = None
     
     def calcular_valor_total(self) -> float:
         """
@@ -89,26 +117,35 @@ class Producto:
         Returns:
             Producto: Instancia del producto
         """
-        producto = cls(
-            id=data['id'],
-            nombre=data['nombre'],
-            categoria=data['categoria'],
-            precio=data['precio'],
-            cantidad=data['cantidad']
-        )
-        producto.fecha_actualizacion = datetime.fromisoformat(data['fecha_actualizacion'])
+        id, nombre, categoria, precio, cantidad, fecha = _CAMPOS_PRODUCTO(data)
+        
+        # Se omite __init__: la fecha guardada reemplaza a la actual, no hace falta leer el reloj
+        producto = cls.__new__(cls)
+        producto.id = _internar(id)
+        producto.nombre = nombre
+        producto.categoria = _internar(categoria)
+        producto.precio = precio
+        producto.cantidad = cantidad
+        producto.fecha_actualizacion = datetime.fromisoformat(fecha)
+        producto._str_cache = None
         return producto
     
     def __str__(self) -> str:
         """
         Representación en string del producto.
         
+        El texto se formatea una sola vez y se reutiliza hasta que el producto cambie
+        mediante actualizar_stock() o actualizar_precio().
+        
         Returns:
             str: String con la información del producto
         """
-        return (f"ID: {self.id} | {self.nombre} | {self.categoria} | "
-                f"Precio: ${self.precio:.2f} | Stock: {self.cantidad} | "
-                f"Última actualización: {self.fecha_actualizacion.strftime('%Y-%m-%d %H:%M')}")
+        texto = self._str_cache
+        if texto is None:
+            texto = self._str_cache = Producto._FORMATO_STR(
+                self.id, self.nombre, self.categoria, self.precio,
+                self.cantidad, self.fecha_actualizacion)
+        return texto
     
     def __repr__(self) -> str:
         """
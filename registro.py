@@ -0,0 +1,30 @@
+import logging
+
+
+def configurar_logger(nombre: str, archivo_log: str) -> logging.Logger:
+    """
+    Configura una sola vez un logger de errores con salida a consola y archivo.
+    
+    El archivo de log solo se crea al escribir el primer mensaje.
+    
+    Args:
+        nombre: Nombre del logger
+        archivo_log: Ruta del archivo de log
+        
+    Returns:
+        logging.Logger: Logger configurado
+    """
+    logger = logging.getLogger(nombre)
+    if not logger.handlers:
+        formato = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        
+        archivo = logging.FileHandler(archivo_log, delay=True)
+        archivo.setFormatter(formato)
+        
+        consola = logging.StreamHandler()
+        consola.setFormatter(formato)
+        
+        logger.addHandler(archivo)
+        logger.addHandler(consola)
+        logger.setLevel(logging.INFO)
+    return logger
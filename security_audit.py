@@ -13,9 +13,69 @@ import json
 import re
 import ast
 import subprocess
-from typing import List, Dict, Any, Tuple
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, TextIO, Union
 from pathlib import Path
 
+# Reglas de detección: (patrón compilado, hallazgos que reporta cada coincidencia).
+# Cada hallazgo es (tipo, severidad, descripción); la descripción puede usar {codigo}.
+_INYECCION_CODIGO = ('CODE_INJECTION', 'CRITICA', 'Uso de {codigo} - riesgo de inyección de código')
+_PATH_TRAVERSAL = ('PATH_TRAVERSAL', 'ALTA', 'Posible vulnerabilidad de path traversal')
+_SQL_INJECTION = ('SQL_INJECTION', 'ALTA', 'Posible vulnerabilidad de SQL injection')
+_XSS = ('XSS', 'ALTA', 'Posible vulnerabilidad de XSS')
+_HARDCODED_SECRET = ('HARDCODED_SECRET', 'ALTA', 'Posible secreto hardcodeado en el código')
+_WEAK_CRYPTO = ('WEAK_CRYPTO', 'MEDIA', 'Uso de criptografía débil: {codigo}')
+
+# Cada patrón se busca por separado con finditer, así que sus coincidencias no se
+# solapan entre sí pero sí con las de otras reglas (p. ej. execute dentro de cursor.execute)
+_REGLAS_VULNERABILIDAD = (
+    (re.compile(r'os\.system\s*\('),
+     (('COMMAND_INJECTION', 'CRITICA', 'Uso inseguro de os.system() - riesgo de inyección de comandos'),)),
+    (re.compile(r'eval\s*\('), (_INYECCION_CODIGO,)),
+    (re.compile(r'exec\s*\('), (_INYECCION_CODIGO,)),
+    (re.compile(r'open\s*\(\s*[^)]*\.\.'), (_PATH_TRAVERSAL,)),
+    (re.compile(r'file\s*\(\s*[^)]*\.\.'), (_PATH_TRAVERSAL,)),
+    (re.compile(r'os\.path\.join\s*\([^)]*\.\.'), (_PATH_TRAVERSAL,)),
+    (re.compile(r'password\s*=\s*["\'][^"\']+["\']'), (_HARDCODED_SECRET,)),
+    (re.compile(r'secret\s*=\s*["\'][^"\']+["\']'), (_HARDCODED_SECRET,)),
+    (re.compile(r'key\s*=\s*["\'][^"\']+["\']'), (_HARDCODED_SECRET,)),
+    (re.compile(r'token\s*=\s*["\'][^"\']+["\']'), (_HARDCODED_SECRET,)),
+    (re.compile(r'md5\s*\('), (_WEAK_CRYPTO,)),
+    (re.compile(r'sha1\s*\('), (_WEAK_CRYPTO,)),
+    (re.compile(r'DES\s*\('), (_WEAK_CRYPTO,)),
+    (re.compile(r'RC4\s*\('), (_WEAK_CRYPTO,)),
+    (re.compile(r'execute\s*\(\s*[^)]*%'), (_SQL_INJECTION,)),
+    (re.compile(r'query\s*\(\s*[^)]*\+'), (_SQL_INJECTION,)),
+    (re.compile(r'cursor\.execute\s*\(\s*[^)]*%'), (_SQL_INJECTION,)),
+    (re.compile(r'innerHTML\s*='), (_XSS,)),
+    (re.compile(r'document\.write\s*\('), (_XSS,)),
+)
+
+_SALTO_LINEA = re.compile('\n')
+
+# Archivos cuyos permisos se revisan: nombres exactos y sufijos
+_ARCHIVOS_SENSIBLES = frozenset({'.env', 'config_seguridad.py'})
+_SUFIJOS_SENSIBLES = ('.log',)
+_PERMISOS_INSEGUROS = frozenset({'666', '777'})
+
+# Severidades reconocidas, de mayor a menor
+_SEVERIDADES = ('CRITICA', 'ALTA', 'MEDIA', 'BAJA')
+
+# Recomendaciones generales incluidas en todos los reportes
+_RECOMENDACIONES = (
+    "Implementar validación y sanitización de todas las entradas de usuario",
+    "Usar subprocess en lugar de os.system() para ejecutar comandos",
+    "Implementar logging de seguridad para monitorear actividades sospechosas",
+    "Usar variables de entorno para secretos en lugar de hardcodearlos",
+    "Implementar autenticación y autorización si el sistema será multiusuario",
+    "Usar HTTPS si el sistema será accesible por red",
+    "Implementar backup y recuperación de datos",
+    "Realizar auditorías de seguridad regulares",
+    "Mantener dependencias actualizadas",
+    "Implementar rate limiting para prevenir ataques de fuerza bruta",
+)
+
 class AuditoriaSeguridad:
     """
     Clase para realizar auditorías de seguridad del sistema.
@@ -26,6 +86,10 @@ class AuditoriaSeguridad:
         self.vulnerabilidades = []
         self.recomendaciones = []
         self.archivos_analizados = []
+        # Vulnerabilidades agrupadas por severidad, actualizadas al generar el reporte
+        self.vulnerabilidades_por_severidad: Dict[str, List[Dict[str, Any]]] = {}
+        # Se desactiva si safety no está instalado, para no volver a intentar lanzarlo
+        self._safety_disponible = True
     
     def ejecutar_auditoria_completa(self) -> Dict[str, Any]:
         """
@@ -36,14 +100,18 @@ class AuditoriaSeguridad:
         """
         print("🔍 Iniciando auditoría de seguridad...")
         
-        # Analizar archivos Python
-        self._analizar_archivos_python()
-        
-        # Verificar configuraciones
-        self._verificar_configuraciones()
-        
-        # Analizar dependencias
-        self._analizar_dependencias()
+        # safety se ejecuta en segundo plano mientras se analizan los archivos
+        with ThreadPoolExecutor(max_workers=1) as ejecutor:
+            resultado_safety = ejecutor.submit(self._ejecutar_safety)
+            
+            # Analizar archivos Python
+            self._analizar_archivos_python()
+            
+            # Verificar configuraciones
+            self._verificar_configuraciones()
+            
+            # Analizar dependencias
+            self._analizar_dependencias(resultado_safety)
         
         # Verificar permisos de archivos
         self._verificar_permisos()
@@ -58,26 +126,23 @@ class AuditoriaSeguridad:
         """Analiza archivos Python en busca de vulnerabilidades."""
         print("📁 Analizando archivos Python...")
         
-        archivos_python = list(Path('.').glob('*.py'))
+        # Un solo recorrido del directorio; el tipo de cada entrada viene en la
+        # propia lectura del directorio, sin un stat() adicional por archivo
+        with os.scandir('.') as entradas:
+            archivos_python = [entrada.name for entrada in entradas
+                               if entrada.name.endswith('.py') and entrada.is_file()]
         
-        for archivo in archivos_python:
-            self.archivos_analizados.append(str(archivo))
-            self._analizar_archivo_python(archivo)
+        for nombre in archivos_python:
+            self.archivos_analizados.append(nombre)
+            self.analizar_archivo_python(Path(nombre))
     
-    def _analizar_archivo_python(self, archivo: Path):
+    def analizar_archivo_python(self, archivo: Path):
         """Analiza un archivo Python específico."""
         try:
             with open(archivo, 'r', encoding='utf-8') as f:
                 contenido = f.read()
             
-            # Buscar vulnerabilidades comunes
-            self._buscar_os_system(archivo, contenido)
-            self._buscar_eval_exec(archivo, contenido)
-            self._buscar_path_traversal(archivo, contenido)
-            self._buscar_hardcoded_secrets(archivo, contenido)
-            self._buscar_weak_crypto(archivo, contenido)
-            self._buscar_sql_injection(archivo, contenido)
-            self._buscar_xss_vulnerabilities(archivo, contenido)
+            self._buscar_vulnerabilidades(archivo, contenido)
             
         except Exception as e:
             self.vulnerabilidades.append({
@@ -88,138 +153,26 @@ class AuditoriaSeguridad:
                 'linea': 0
             })
     
-    def _buscar_os_system(self, archivo: Path, contenido: str):
-        """Busca uso inseguro de os.system()."""
-        patron = r'os\.system\s*\('
-        matches = re.finditer(patron, contenido)
-        
-        for match in matches:
-            self.vulnerabilidades.append({
-                'tipo': 'COMMAND_INJECTION',
-                'archivo': str(archivo),
-                'severidad': 'CRITICA',
-                'descripcion': 'Uso inseguro de os.system() - riesgo de inyección de comandos',
-                'linea': contenido[:match.start()].count('\n') + 1,
-                'codigo': match.group()
-            })
-    
-    def _buscar_eval_exec(self, archivo: Path, contenido: str):
-        """Busca uso de eval() o exec()."""
-        patrones = [r'eval\s*\(', r'exec\s*\(']
-        
-        for patron in patrones:
-            matches = re.finditer(patron, contenido)
-            for match in matches:
-                self.vulnerabilidades.append({
-                    'tipo': 'CODE_INJECTION',
-                    'archivo': str(archivo),
-                    'severidad': 'CRITICA',
-                    'descripcion': f'Uso de {match.group()} - riesgo de inyección de código',
-                    'linea': contenido[:match.start()].count('\n') + 1,
-                    'codigo': match.group()
-                })
-    
-    def _buscar_path_traversal(self, archivo: Path, contenido: str):
-        """Busca vulnerabilidades de path traversal."""
-        patrones = [
-            r'open\s*\(\s*[^)]*\.\.',
-            r'file\s*\(\s*[^)]*\.\.',
-            r'os\.path\.join\s*\([^)]*\.\.'
-        ]
-        
-        for patron in patrones:
-            matches = re.finditer(patron, contenido)
-            for match in matches:
-                self.vulnerabilidades.append({
-                    'tipo': 'PATH_TRAVERSAL',
-                    'archivo': str(archivo),
-                    'severidad': 'ALTA',
-                    'descripcion': 'Posible vulnerabilidad de path traversal',
-                    'linea': contenido[:match.start()].count('\n') + 1,
-                    'codigo': match.group()
-                })
-    
-    def _buscar_hardcoded_secrets(self, archivo: Path, contenido: str):
-        """Busca secretos hardcodeados."""
-        patrones = [
-            r'password\s*=\s*["\'][^"\']+["\']',
-            r'secret\s*=\s*["\'][^"\']+["\']',
-            r'key\s*=\s*["\'][^"\']+["\']',
-            r'token\s*=\s*["\'][^"\']+["\']'
-        ]
-        
-        for patron in patrones:
-            matches = re.finditer(patron, contenido)
-            for match in matches:
-                self.vulnerabilidades.append({
-                    'tipo': 'HARDCODED_SECRET',
-                    'archivo': str(archivo),
-                    'severidad': 'ALTA',
-                    'descripcion': 'Posible secreto hardcodeado en el código',
-                    'linea': contenido[:match.start()].count('\n') + 1,
-                    'codigo': match.group()
-                })
-    
-    def _buscar_weak_crypto(self, archivo: Path, contenido: str):
-        """Busca uso de criptografía débil."""
-        patrones = [
-            r'md5\s*\(',
-            r'sha1\s*\(',
-            r'DES\s*\(',
-            r'RC4\s*\('
-        ]
-        
-        for patron in patrones:
-            matches = re.finditer(patron, contenido)
-            for match in matches:
-                self.vulnerabilidades.append({
-                    'tipo': 'WEAK_CRYPTO',
-                    'archivo': str(archivo),
-                    'severidad': 'MEDIA',
-                    'descripcion': f'Uso de criptografía débil: {match.group()}',
-                    'linea': contenido[:match.start()].count('\n') + 1,
-                    'codigo': match.group()
-                })
-    
-    def _buscar_sql_injection(self, archivo: Path, contenido: str):
-        """Busca posibles vulnerabilidades de SQL injection."""
-        patrones = [
-            r'execute\s*\(\s*[^)]*%',
-            r'query\s*\(\s*[^)]*\+',
-            r'cursor\.execute\s*\(\s*[^)]*%'
-        ]
-        
-        for patron in patrones:
-            matches = re.finditer(patron, contenido)
-            for match in matches:
-                self.vulnerabilidades.append({
-                    'tipo': 'SQL_INJECTION',
-                    'archivo': str(archivo),
-                    'severidad': 'ALTA',
-                    'descripcion': 'Posible vulnerabilidad de SQL injection',
-                    'linea': contenido[:match.start()].count('\n') + 1,
-                    'codigo': match.group()
-                })
-    
-    def _buscar_xss_vulnerabilities(self, archivo: Path, contenido: str):
-        """Busca vulnerabilidades de XSS."""
-        patrones = [
-            r'innerHTML\s*=',
-            r'document\.write\s*\(',
-            r'eval\s*\('
-        ]
+    def _buscar_vulnerabilidades(self, archivo: Path, contenido: str):
+        """Busca en el contenido las coincidencias de cada regla de detección."""
+        nombre_archivo = str(archivo)
+        # Posición donde empieza cada línea, para ubicar las coincidencias con bisect
+        inicios_linea = [0]
+        inicios_linea.extend(salto.end() for salto in _SALTO_LINEA.finditer(contenido))
         
-        for patron in patrones:
-            matches = re.finditer(patron, contenido)
-            for match in matches:
-                self.vulnerabilidades.append({
-                    'tipo': 'XSS',
-                    'archivo': str(archivo),
-                    'severidad': 'ALTA',
-                    'descripcion': 'Posible vulnerabilidad de XSS',
-                    'linea': contenido[:match.start()].count('\n') + 1,
-                    'codigo': match.group()
-                })
+        for patron, hallazgos in _REGLAS_VULNERABILIDAD:
+            for match in patron.finditer(contenido):
+                codigo = match.group()
+                linea = bisect_right(inicios_linea, match.start())
+                for tipo, severidad, descripcion in hallazgos:
+                    self.vulnerabilidades.append({
+                        'tipo': tipo,
+                        'archivo': nombre_archivo,
+                        'severidad': severidad,
+                        'descripcion': descripcion.format(codigo=codigo),
+                        'linea': linea,
+                        'codigo': codigo
+                    })
     
     def _verificar_configuraciones(self):
         """Verifica configuraciones de seguridad."""
@@ -245,55 +198,83 @@ class AuditoriaSeguridad:
                 'linea': 0
             })
     
-    def _analizar_dependencias(self):
-        """Analiza dependencias en busca de vulnerabilidades."""
+    def _ejecutar_safety(self) -> Optional[subprocess.CompletedProcess]:
+        """
+        Ejecuta safety check sobre requirements.txt.
+        
+        Returns:
+            Resultado del proceso, o None si no hay requirements.txt, safety no está
+            instalado o no terminó a tiempo
+        """
+        if not self._safety_disponible or not os.path.exists('requirements.txt'):
+            return None
+        
+        try:
+            return subprocess.run(['safety', 'check'],
+                                  capture_output=True, text=True, timeout=30)
+        except FileNotFoundError:
+            self._safety_disponible = False
+        except subprocess.TimeoutExpired:
+            pass
+        return None
+    
+    def _analizar_dependencias(self, resultado_safety: Optional[Future] = None):
+        """
+        Analiza dependencias en busca de vulnerabilidades.
+        
+        Args:
+            resultado_safety: Ejecución de safety ya lanzada en segundo plano; si se
+                omite, safety se ejecuta en este momento
+        """
         print("📦 Analizando dependencias...")
         
-        if os.path.exists('requirements.txt'):
-            try:
-                # Ejecutar safety check
-                result = subprocess.run(['safety', 'check'], 
-                                      capture_output=True, text=True, timeout=30)
-                if result.returncode != 0:
-                    self.vulnerabilidades.append({
-                        'tipo': 'VULNERABLE_DEPENDENCY',
-                        'archivo': 'requirements.txt',
-                        'severidad': 'ALTA',
-                        'descripcion': 'Dependencias vulnerables encontradas',
-                        'linea': 0,
-                        'detalles': result.stdout
-                    })
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                pass
+        if resultado_safety is not None:
+            result = resultado_safety.result()
+        else:
+            result = self._ejecutar_safety()
+        
+        if result is not None and result.returncode != 0:
+            self.vulnerabilidades.append({
+                'tipo': 'VULNERABLE_DEPENDENCY',
+                'archivo': 'requirements.txt',
+                'severidad': 'ALTA',
+                'descripcion': 'Dependencias vulnerables encontradas',
+                'linea': 0,
+                'detalles': result.stdout
+            })
     
     def _verificar_permisos(self):
         """Verifica permisos de archivos."""
         print("🔐 Verificando permisos...")
         
-        archivos_sensibles = ['.env', 'config_seguridad.py', '*.log']
-        
-        for patron in archivos_sensibles:
-            for archivo in Path('.').glob(patron):
-                if archivo.exists():
-                    stat = archivo.stat()
-                    permisos = oct(stat.st_mode)[-3:]
-                    
-                    if permisos in ['666', '777']:
-                        self.vulnerabilidades.append({
-                            'tipo': 'INSECURE_PERMISSIONS',
-                            'archivo': str(archivo),
-                            'severidad': 'MEDIA',
-                            'descripcion': f'Permisos inseguros: {permisos}',
-                            'linea': 0
-                        })
+        with os.scandir('.') as entradas:
+            for entrada in entradas:
+                nombre = entrada.name
+                if nombre not in _ARCHIVOS_SENSIBLES and not nombre.endswith(_SUFIJOS_SENSIBLES):
+                    continue
+                
+                try:
+                    stat = entrada.stat()
+                except OSError:
+                    continue  # Enlace roto o archivo eliminado durante la auditoría
+                permisos = oct(stat.st_mode)[-3:]
+                
+                if permisos in _PERMISOS_INSEGUROS:
+                    self.vulnerabilidades.append({
+                        'tipo': 'INSECURE_PERMISSIONS',
+                        'archivo': nombre,
+                        'severidad': 'MEDIA',
+                        'descripcion': f'Permisos inseguros: {permisos}',
+                        'linea': 0
+                    })
     
     def _generar_reporte(self) -> Dict[str, Any]:
         """Genera el reporte final de la auditoría."""
-        # Contar vulnerabilidades por severidad
-        criticas = len([v for v in self.vulnerabilidades if v['severidad'] == 'CRITICA'])
-        altas = len([v for v in self.vulnerabilidades if v['severidad'] == 'ALTA'])
-        medias = len([v for v in self.vulnerabilidades if v['severidad'] == 'MEDIA'])
-        bajas = len([v for v in self.vulnerabilidades if v['severidad'] == 'BAJA'])
+        # Agrupar las vulnerabilidades por severidad en una sola pasada
+        por_severidad = {severidad: [] for severidad in _SEVERIDADES}
+        for vulnerabilidad in self.vulnerabilidades:
+            por_severidad.setdefault(vulnerabilidad['severidad'], []).append(vulnerabilidad)
+        self.vulnerabilidades_por_severidad = por_severidad
         
         # Generar recomendaciones
         self._generar_recomendaciones()
@@ -301,10 +282,10 @@ class AuditoriaSeguridad:
         reporte = {
             'resumen': {
                 'total_vulnerabilidades': len(self.vulnerabilidades),
-                'criticas': criticas,
-                'altas': altas,
-                'medias': medias,
-                'bajas': bajas,
+                'criticas': len(por_severidad['CRITICA']),
+                'altas': len(por_severidad['ALTA']),
+                'medias': len(por_severidad['MEDIA']),
+                'bajas': len(por_severidad['BAJA']),
                 'archivos_analizados': len(self.archivos_analizados)
             },
             'vulnerabilidades': self.vulnerabilidades,
@@ -316,25 +297,32 @@ class AuditoriaSeguridad:
     
     def _generar_recomendaciones(self):
         """Genera recomendaciones de seguridad."""
-        self.recomendaciones = [
-            "Implementar validación y sanitización de todas las entradas de usuario",
-            "Usar subprocess en lugar de os.system() para ejecutar comandos",
-            "Implementar logging de seguridad para monitorear actividades sospechosas",
-            "Usar variables de entorno para secretos en lugar de hardcodearlos",
-            "Implementar autenticación y autorización si el sistema será multiusuario",
-            "Usar HTTPS si el sistema será accesible por red",
-            "Implementar backup y recuperación de datos",
-            "Realizar auditorías de seguridad regulares",
-            "Mantener dependencias actualizadas",
-            "Implementar rate limiting para prevenir ataques de fuerza bruta"
-        ]
+        # Lista propia por auditoría para que modificarla no altere la constante
+        self.recomendaciones = list(_RECOMENDACIONES)
     
-    def guardar_reporte(self, archivo: str = 'security_audit_report.json'):
-        """Guarda el reporte en un archivo JSON."""
-        reporte = self._generar_reporte()
+    def guardar_reporte(self, archivo: Union[str, TextIO] = 'security_audit_report.json',
+                        reporte: Optional[Dict[str, Any]] = None):
+        """
+        Guarda el reporte en un archivo JSON.
+        
+        Args:
+            archivo: Ruta del archivo de salida, o un objeto de texto ya abierto
+                (p. ej. sys.stdout o io.StringIO) donde escribir el JSON
+            reporte: Reporte ya generado (p. ej. el devuelto por ejecutar_auditoria_completa);
+                si se omite, se genera a partir del estado actual
+        """
+        if reporte is None:
+            reporte = self._generar_reporte()
+        
+        # Serializar en memoria y escribir de una vez: json.dump con indentación
+        # hace una escritura por cada fragmento generado
+        contenido = json.dumps(reporte, indent=2, ensure_ascii=False)
+        if hasattr(archivo, 'write'):
+            archivo.write(contenido)
+            return
         
         with open(archivo, 'w', encoding='utf-8') as f:
-            json.dump(reporte, f, indent=2, ensure_ascii=False)
+            f.write(contenido)
         
         print(f"📄 Reporte guardado en: {archivo}")
 
@@ -354,11 +342,11 @@ def main():
     print(f"Medias: {reporte['resumen']['medias']}")
     print(f"Bajas: {reporte['resumen']['bajas']}")
     
-    # Guardar reporte
-    auditor.guardar_reporte()
+    # Guardar el mismo reporte sin volver a generarlo
+    auditor.guardar_reporte(reporte=reporte)
     
     # Mostrar vulnerabilidades críticas
-    criticas = [v for v in reporte['vulnerabilidades'] if v['severidad'] == 'CRITICA']
+    criticas = auditor.vulnerabilidades_por_severidad['CRITICA']
     if criticas:
         print("\n🚨 VULNERABILIDADES CRÍTICAS:")
         for vuln in criticas:
@@ -0,0 +1,40 @@
+import os
+import shutil
+import tempfile
+
+
+class DirectorioTemporalMixin:
+    """
+    Mixin para clases de test que necesitan archivos propios en disco.
+    
+    Crea un único directorio temporal por clase y da a cada test una ruta
+    propia dentro de él, que no existe hasta que el test la escribe.
+    """
+    
+    @classmethod
+    def setUpClass(cls):
+        """
+        Crea un único directorio temporal para los archivos de la clase.
+        """
+        super().setUpClass()
+        cls.directorio_temporal = tempfile.mkdtemp()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Elimina el directorio temporal y los archivos creados por los tests.
+        """
+        shutil.rmtree(cls.directorio_temporal, ignore_errors=True)
+        super().tearDownClass()
+    
+    def ruta_temporal(self, extension: str = ".json") -> str:
+        """
+        Ruta de un archivo propio del test actual dentro del directorio temporal.
+        
+        Args:
+            extension: Extensión del archivo
+            
+        Returns:
+            str: Ruta del archivo, nombrada según el test
+        """
+        return os.path.join(self.directorio_temporal, f"{self._testMethodName}{extension}")
@@ -1,12 +1,15 @@
 import unittest
 import os
+from unittest.mock import patch
 from config_seguridad import ConfiguracionSeguridad
 
 
 class TestConfiguracionSeguridad(unittest.TestCase):
     
-    def setUp(self):
-        self.config = ConfiguracionSeguridad()
+    @classmethod
+    def setUpClass(cls):
+        # Ningún test modifica la configuración: se comparte una sola instancia
+        cls.config = ConfiguracionSeguridad()
 
     # --- Clave segura ---
     def test_obtener_clave_segura_longitud(self):
@@ -45,6 +48,12 @@ class TestConfiguracionSeguridad(unittest.TestCase):
         """Cubre líneas 109-111"""
         self.assertFalse(self.config.verificar_hash("texto", "hashsinformato"))
 
+    def test_verificar_hash_compatible_y_no_ascii(self):
+        # Formato 'hash:salt' de siempre y hashes manipulados con caracteres no ASCII
+        hash_resultado = self.config.hash_seguro("texto", "abc123")
+        self.assertTrue(self.config.verificar_hash("texto", hash_resultado))
+        self.assertFalse(self.config.verificar_hash("texto", "ñandú:abc123"))
+
     # --- Validación ---
     def test_validar_entrada_segura_normal(self):
         self.assertTrue(self.config.validar_entrada_segura("texto normal"))
@@ -52,6 +61,11 @@ class TestConfiguracionSeguridad(unittest.TestCase):
     def test_validar_entrada_segura_peligrosa(self):
         self.assertFalse(self.config.validar_entrada_segura("<script>"))
 
+    def test_validar_entrada_segura_cada_caracter_peligroso(self):
+        for caracter in '<>"\'&;()|`$':
+            with self.subTest(caracter=caracter):
+                self.assertFalse(self.config.validar_entrada_segura(f"texto{caracter}texto"))
+
     def test_validar_entrada_segura_demasiado_larga(self):
         entrada = "a" * (self.config.configuraciones['max_input_length'] + 1)
         self.assertFalse(self.config.validar_entrada_segura(entrada))
@@ -94,10 +108,10 @@ class TestConfiguracionSeguridad(unittest.TestCase):
         self.assertEqual(valor, "default")
 
     def test_configuracion_sobreescrita_por_entorno(self):
-        os.environ["MAX_FILE_SIZE"] = "2048"
-        nueva_config = ConfiguracionSeguridad()
+        # patch.dict restaura el entorno aunque la aserción falle
+        with patch.dict(os.environ, {"MAX_FILE_SIZE": "2048"}):
+            nueva_config = ConfiguracionSeguridad()
         self.assertEqual(nueva_config.obtener_configuracion("max_file_size"), 2048)
-        del os.environ["MAX_FILE_SIZE"]
 
 
 if __name__ == "__main__":
@@ -1,10 +1,10 @@
 import unittest
-import os
-import tempfile
 import json
+from unittest.mock import patch
 from datetime import datetime
 from producto import Producto
 from inventario import Inventario
+from testing.directorio_temporal import DirectorioTemporalMixin
 
 class TestProducto(unittest.TestCase):
     """
@@ -28,6 +28,14 @@ class TestProducto(unittest.TestCase):
         self.assertEqual(self.producto.cantidad, 10)
         self.assertIsInstance(self.producto.fecha_actualizacion, datetime)
     
+    def test_producto_sin_atributos_dinamicos(self):
+        """
+        Test para verificar que Producto usa __slots__ y no admite atributos nuevos.
+        """
+        self.assertFalse(hasattr(self.producto, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.producto.atributo_inexistente = 1
+    
     def test_actualizar_precio(self):
         """
         Test para actualizar precio de producto.
@@ -46,6 +54,18 @@ class TestProducto(unittest.TestCase):
         self.assertEqual(self.producto.cantidad, nueva_cantidad)
         self.assertIsInstance(self.producto.fecha_actualizacion, datetime)
     
+    def test_str_se_actualiza_tras_modificar(self):
+        """
+        Test para verificar que el texto cacheado de __str__ refleja los cambios.
+        """
+        texto = str(self.producto)
+        self.assertIs(str(self.producto), texto)
+        
+        self.producto.actualizar_stock(7)
+        self.assertIn("Stock: 7", str(self.producto))
+        self.producto.actualizar_precio(12.5)
+        self.assertIn("Precio: $12.50", str(self.producto))
+    
     def test_calcular_valor_total(self):
         """
         Test para calcular valor total del producto.
@@ -57,27 +77,19 @@ class TestProducto(unittest.TestCase):
         """
         Test para calcular descuento de forma segura.
         """
-        # Test descuento válido
-        precio_con_descuento = self.producto.calcular_descuento_seguro(20.0)
-        self.assertEqual(precio_con_descuento, 80.0)
-        
-        # Test descuento 0%
-        precio_sin_descuento = self.producto.calcular_descuento_seguro(0.0)
-        self.assertEqual(precio_sin_descuento, 100.0)
-        
-        # Test descuento 100%
-        precio_gratis = self.producto.calcular_descuento_seguro(100.0)
-        self.assertEqual(precio_gratis, 0.0)
+        # Descuento válido, 0% y 100%
+        casos = ((20.0, 80.0), (0.0, 100.0), (100.0, 0.0))
+        for porcentaje, precio_esperado in casos:
+            with self.subTest(porcentaje=porcentaje):
+                self.assertEqual(self.producto.calcular_descuento_seguro(porcentaje), precio_esperado)
     
     def test_calcular_descuento_invalido(self):
         """
         Test para descuentos inválidos.
         """
-        with self.assertRaises(ValueError):
-            self.producto.calcular_descuento_seguro(-10.0)
-        
-        with self.assertRaises(ValueError):
-            self.producto.calcular_descuento_seguro(150.0)
+        for porcentaje in (-10.0, 150.0):
+            with self.subTest(porcentaje=porcentaje), self.assertRaises(ValueError):
+                self.producto.calcular_descuento_seguro(porcentaje)
     
     def test_procesar_datos_producto_optimizado(self):
         """
@@ -134,8 +146,24 @@ class TestProducto(unittest.TestCase):
         self.assertEqual(producto.precio, 200.0)
         self.assertEqual(producto.cantidad, 5)
         self.assertIsInstance(producto.fecha_actualizacion, datetime)
+    
+    def test_fechas_iso_ida_y_vuelta(self):
+        """
+        Test para verificar la conversión de fechas con y sin zona horaria.
+        """
+        datos = self.producto.to_dict()
+        copia = Producto.from_dict(datos)
+        self.assertEqual(copia.fecha_actualizacion, self.producto.fecha_actualizacion)
+        
+        # Mismo instante en otra zona horaria conserva su propio texto ISO
+        datos_utc = dict(datos, fecha_actualizacion='2024-01-01T12:00:00+00:00')
+        datos_cet = dict(datos, fecha_actualizacion='2024-01-01T13:00:00+01:00')
+        self.assertEqual(Producto.from_dict(datos_utc).to_dict()['fecha_actualizacion'],
+                         '2024-01-01T12:00:00+00:00')
+        self.assertEqual(Producto.from_dict(datos_cet).to_dict()['fecha_actualizacion'],
+                         '2024-01-01T13:00:00+01:00')
 
-class TestInventario(unittest.TestCase):
+class TestInventario(DirectorioTemporalMixin, unittest.TestCase):
     """
     Tests para la clase Inventario.
     """
@@ -144,21 +172,14 @@ class TestInventario(unittest.TestCase):
         """
         Configuración inicial para cada test.
         """
-        self.temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json')
-        self.temp_file.close()
+        # Archivo propio de cada test que aún no existe: el inventario arranca vacío sin leer disco
+        self.archivo_datos = self.ruta_temporal()
         
-        self.inventario = Inventario(self.temp_file.name)
+        self.inventario = Inventario(self.archivo_datos)
         self.producto1 = Producto("TEST001", "Producto 1", "Categoria A", 100.0, 10)
         self.producto2 = Producto("TEST002", "Producto 2", "Categoria B", 200.0, 5)
         self.producto3 = Producto("TEST003", "Producto 3", "Categoria A", 50.0, 20)
     
-    def tearDown(self):
-        """
-        Limpieza después de cada test.
-        """
-        if os.path.exists(self.temp_file.name):
-            os.unlink(self.temp_file.name)
-    
     def test_agregar_producto(self):
         """
         Test para agregar producto al inventario.
@@ -233,6 +254,23 @@ class TestInventario(unittest.TestCase):
         resultado_inexistente = self.inventario.actualizar_precio("INEXISTENTE", 100.0)
         self.assertFalse(resultado_inexistente)
     
+    def test_actualizar_producto_encontrado(self):
+        """
+        Test para actualizar y eliminar un producto ya obtenido.
+        """
+        self.inventario.agregar_producto(self.producto1)
+        producto = self.inventario.obtener_producto("TEST001")
+        
+        self.assertTrue(self.inventario.actualizar_stock_producto(producto, 30))
+        self.assertTrue(self.inventario.actualizar_precio_producto(producto, 120.0))
+        self.assertEqual(self.inventario.productos["TEST001"].cantidad, 30)
+        self.assertEqual(self.inventario.productos["TEST001"].precio, 120.0)
+        
+        # Eliminar el producto y verificar que una segunda eliminación falla
+        self.assertTrue(self.inventario.eliminar_producto_encontrado(producto))
+        self.assertNotIn("TEST001", self.inventario.productos)
+        self.assertFalse(self.inventario.eliminar_producto_encontrado(producto))
+    
     def test_buscar_por_nombre(self):
         """
         Test para buscar productos por nombre.
@@ -253,6 +291,26 @@ class TestInventario(unittest.TestCase):
         resultados_vacios = self.inventario.buscar_por_nombre("Inexistente")
         self.assertEqual(len(resultados_vacios), 0)
     
+    def test_buscar_por_nombre_indice(self):
+        """
+        Test para búsquedas por nombre cortas, sin distinción de mayúsculas y tras eliminar.
+        """
+        self.inventario.agregar_producto(self.producto1)
+        self.inventario.agregar_producto(self.producto2)
+        
+        self.assertEqual(len(self.inventario.buscar_por_nombre("o")), 2)
+        self.assertEqual(len(self.inventario.buscar_por_nombre("PRODUCTO 2")), 1)
+        self.assertEqual(self.inventario.buscar_por_nombre("ducto 1x"), [])
+        
+        # casefold iguala formas que lower() no distingue (ß -> ss)
+        self.inventario.agregar_producto(Producto("TEST004", "Straße", "Categoría Ñ", 10.0, 1))
+        self.assertEqual([p.id for p in self.inventario.buscar_por_nombre("STRASSE")], ["TEST004"])
+        self.assertEqual([p.id for p in self.inventario.buscar_por_categoria("categoría ñ")], ["TEST004"])
+        self.inventario.eliminar_producto("TEST004")
+        
+        self.inventario.eliminar_producto("TEST002")
+        self.assertEqual([p.id for p in self.inventario.buscar_por_nombre("producto")], ["TEST001"])
+    
     def test_buscar_por_categoria(self):
         """
         Test para buscar productos por categoría.
@@ -272,6 +330,20 @@ class TestInventario(unittest.TestCase):
         resultados_vacios = self.inventario.buscar_por_categoria("Categoria C")
         self.assertEqual(len(resultados_vacios), 0)
     
+    def test_buscar_por_categoria_tras_eliminar_y_recargar(self):
+        """
+        Test para verificar que el índice de categorías se mantiene al eliminar y recargar.
+        """
+        self.inventario.agregar_producto(self.producto1)
+        self.inventario.agregar_producto(self.producto3)
+        
+        self.inventario.eliminar_producto("TEST001")
+        resultados = self.inventario.buscar_por_categoria("categoria a")
+        self.assertEqual([p.id for p in resultados], ["TEST003"])
+        
+        recargado = Inventario(self.archivo_datos)
+        self.assertEqual([p.id for p in recargado.buscar_por_categoria("Categoria")], ["TEST003"])
+    
     def test_obtener_todos_productos(self):
         """
         Test para obtener todos los productos.
@@ -282,6 +354,20 @@ class TestInventario(unittest.TestCase):
         todos_productos = self.inventario.obtener_todos_productos()
         self.assertEqual(len(todos_productos), 2)
     
+    def test_formatear_productos(self):
+        """
+        Test para formatear productos en un único bloque.
+        """
+        self.inventario.agregar_producto(self.producto1)
+        self.inventario.agregar_producto(self.producto2)
+        
+        texto = self.inventario.formatear_productos()
+        lineas = texto.split("\n")
+        self.assertEqual(lineas, [str(self.producto1), str(self.producto2)])
+        self.assertIn("Precio: $100.00", lineas[0])
+        
+        self.assertEqual(self.inventario.formatear_productos([self.producto2]), str(self.producto2))
+    
     def test_productos_bajo_stock(self):
         """
         Test para obtener productos con stock bajo.
@@ -372,12 +458,62 @@ class TestInventario(unittest.TestCase):
         self.inventario.agregar_producto(self.producto2)
         
         # Crear nuevo inventario que cargue los datos
-        nuevo_inventario = Inventario(self.temp_file.name)
+        nuevo_inventario = Inventario(self.archivo_datos)
         
         # Verificar que los datos se cargaron correctamente
         self.assertEqual(len(nuevo_inventario.productos), 2)
         self.assertIn("TEST001", nuevo_inventario.productos)
         self.assertIn("TEST002", nuevo_inventario.productos)
+    
+    def test_cargar_archivo_vacio(self):
+        """
+        Test para verificar que un archivo vacío se carga como inventario vacío sin errores.
+        """
+        open(self.archivo_datos, 'w').close()
+        
+        with patch('builtins.print') as mock_print:
+            inventario = Inventario(self.archivo_datos)
+        
+        self.assertEqual(inventario.productos, {})
+        mock_print.assert_not_called()
+        self.assertTrue(inventario.agregar_producto(self.producto1))
+        self.assertEqual(len(Inventario(self.archivo_datos).productos), 1)
+
+    def test_cargar_valores_no_textuales(self):
+        """
+        Test para verificar que los productos con ID, nombre o categoría numéricos se cargan como antes.
+        """
+        datos = {"productos": [
+            {"id": 7, "nombre": "Producto 7", "categoria": "Categoria A", "precio": 10.0,
+             "cantidad": 1, "fecha_actualizacion": "2024-01-01T00:00:00"},
+            {"id": "TEST008", "nombre": 8, "categoria": 3, "precio": 20.0,
+             "cantidad": 2, "fecha_actualizacion": "2024-01-01T00:00:00"},
+        ]}
+        with open(self.archivo_datos, 'w', encoding='utf-8') as archivo:
+            json.dump(datos, archivo)
+        
+        with patch('builtins.print') as mock_print:
+            inventario = Inventario(self.archivo_datos)
+        
+        mock_print.assert_not_called()
+        self.assertEqual(set(inventario.productos), {7, "TEST008"})
+        self.assertEqual(inventario.productos[7].id, 7)
+        self.assertEqual(inventario.productos["TEST008"].categoria, 3)
+
+    def test_lote_guarda_una_sola_vez(self):
+        """Test para agrupar operaciones en una única escritura."""
+        with patch.object(self.inventario, 'guardar_datos', wraps=self.inventario.guardar_datos) as guardar:
+            with self.inventario.lote():
+                self.inventario.agregar_producto(self.producto1)
+                with self.inventario.lote():
+                    self.inventario.agregar_producto(self.producto2)
+                self.inventario.actualizar_stock("TEST001", 3)
+                guardar.assert_not_called()
+            guardar.assert_called_once()
+        
+        nuevo_inventario = Inventario(self.archivo_datos)
+        self.assertEqual(len(nuevo_inventario.productos), 2)
+        self.assertEqual(nuevo_inventario.productos["TEST001"].cantidad, 3)
 
     def test_generar_reporte_stock_bajo(self):
         """Test generación de reporte de stock bajo."""
@@ -397,6 +533,19 @@ class TestInventario(unittest.TestCase):
         self.assertIn("ESTADÍSTICAS", estadisticas)
         self.assertIn("Total de productos: 2", estadisticas)
 
+    def test_generar_estadisticas_contenido(self):
+        """Test del contenido de las estadísticas calculadas en un solo recorrido."""
+        self.inventario.agregar_producto(self.producto1)
+        self.inventario.agregar_producto(self.producto2)
+        self.inventario.agregar_producto(self.producto3)
+        
+        estadisticas = self.inventario.generar_estadisticas()
+        self.assertIn("Valor total del inventario: $3000.00", estadisticas)
+        self.assertIn(f"PRODUCTO MÁS CARO:\n{self.producto2}", estadisticas)
+        self.assertIn(f"PRODUCTO MÁS BARATO:\n{self.producto3}", estadisticas)
+        self.assertIn("Categoria A: $75.00", estadisticas)
+        self.assertIn("Categoria B: $200.00", estadisticas)
+
     def test_obtener_producto_mas_caro(self):
         """Test obtener producto más caro."""
         self.inventario.agregar_producto(self.producto1)  # 100.0
@@ -413,7 +562,17 @@ class TestInventario(unittest.TestCase):
         promedios = self.inventario.calcular_promedio_precios_por_categoria()
         self.assertIn("Categoria A", promedios)
 
-class TestIntegracion(unittest.TestCase):
+    def test_promedios_por_categoria_coinciden_con_estadisticas(self):
+        """El promedio por categoría y el resumen de estadísticas coinciden, incluso si productos se asigna directamente."""
+        self.inventario.agregar_producto(self.producto1)
+        self.inventario.agregar_producto(self.producto3)
+        self.inventario.productos["TEST002"] = self.producto2
+        
+        promedios = self.inventario.calcular_promedio_precios_por_categoria()
+        self.assertEqual(promedios, {"Categoria A": 75.0, "Categoria B": 200.0})
+        self.assertEqual(self.inventario._resumir_productos()[3], promedios)
+
+class TestIntegracion(DirectorioTemporalMixin, unittest.TestCase):
     """
     Tests de integración del sistema completo.
     """
@@ -422,16 +581,8 @@ class TestIntegracion(unittest.TestCase):
         """
         Configuración para tests de integración.
         """
-        self.temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json')
-        self.temp_file.close()
-        self.inventario = Inventario(self.temp_file.name)
-    
-    def tearDown(self):
-        """
-        Limpieza después de cada test.
-        """
-        if os.path.exists(self.temp_file.name):
-            os.unlink(self.temp_file.name)
+        self.archivo_datos = self.ruta_temporal()
+        self.inventario = Inventario(self.archivo_datos)
     
     def test_flujo_completo_inventario(self):
         """
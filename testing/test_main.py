@@ -1,84 +1,76 @@
 import unittest
 from unittest.mock import patch, MagicMock
-import tempfile
-import os
+from inventario import Inventario
 from main import SistemaInventario
+from producto import Producto
+from testing.directorio_temporal import DirectorioTemporalMixin
 
-class TestSistemaInventarioCompleto(unittest.TestCase):
+class TestSistemaInventarioCompleto(DirectorioTemporalMixin, unittest.TestCase):
     
     def setUp(self):
-        self.temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json')
-        self.temp_file.close()
-        
-        with patch('inventario.Inventario') as mock_inv:
-            mock_inv.return_value.archivo_datos = self.temp_file.name
+        # Un archivo por test dentro del directorio compartido: no se crea nada en disco hasta guardar
+        inventario = Inventario(self.ruta_temporal())
+        with patch('main.Inventario', return_value=inventario):
             self.sistema = SistemaInventario()
     
-    def tearDown(self):
-        if os.path.exists(self.temp_file.name):
-            os.unlink(self.temp_file.name)
-    
-    @patch('builtins.input', side_effect=['TEST001', 'Laptop', 'Electronica', '1000', '5'])
+    @patch('builtins.input', side_effect=['TEST001', 'Laptop', 'Electronica', '1000', '5', ''])
     @patch('builtins.print')
     def test_agregar_producto_flujo_completo(self, mock_print, mock_input):
         """Test flujo completo agregar producto."""
         self.sistema.agregar_producto()
         # Verificar que se llamó al inventario
+        self.assertIsNotNone(self.sistema.inventario.obtener_producto('TEST001'))
         
-    @patch('builtins.input', return_value='')
-    def test_agregar_producto_cancelado(self, mock_input):
+    @patch.object(SistemaInventario, 'pausar', return_value=None)
+    def test_agregar_producto_cancelado(self, mock_pausar):
         """Test cancelar agregar producto."""
         with patch.object(self.sistema, 'obtener_entrada', return_value=None):
             self.sistema.agregar_producto()
     
-    @patch('builtins.input', side_effect=['TEST001', 's'])
-    def test_eliminar_producto_confirmado(self, mock_input):
+    @patch.object(SistemaInventario, 'pausar', return_value=None)
+    def test_eliminar_producto_confirmado(self, mock_pausar):
         """Test eliminar producto con confirmación."""
-        from producto import Producto
         prod = Producto('TEST001', 'Test', 'Cat', 100.0, 10)
         self.sistema.inventario.agregar_producto(prod)
         
         with patch.object(self.sistema, 'obtener_entrada', side_effect=['TEST001', 's']):
             self.sistema.eliminar_producto()
     
-    @patch('builtins.input', side_effect=['TEST001', 'n'])
-    def test_eliminar_producto_cancelado(self, mock_input):
+    @patch.object(SistemaInventario, 'pausar', return_value=None)
+    def test_eliminar_producto_cancelado(self, mock_pausar):
         """Test cancelar eliminación."""
-        from producto import Producto
         prod = Producto('TEST001', 'Test', 'Cat', 100.0, 10)
         self.sistema.inventario.agregar_producto(prod)
         
         with patch.object(self.sistema, 'obtener_entrada', side_effect=['TEST001', 'n']):
             self.sistema.eliminar_producto()
     
-    @patch('builtins.input', side_effect=['TEST001', '20'])
-    def test_actualizar_stock_exitoso(self, mock_input):
+    @patch.object(SistemaInventario, 'pausar', return_value=None)
+    def test_actualizar_stock_exitoso(self, mock_pausar):
         """Test actualizar stock."""
-        from producto import Producto
         prod = Producto('TEST001', 'Test', 'Cat', 100.0, 10)
         self.sistema.inventario.agregar_producto(prod)
         
         with patch.object(self.sistema, 'obtener_entrada', side_effect=['TEST001', 20]):
             self.sistema.actualizar_stock()
     
-    @patch('builtins.input', side_effect=['TEST001', '150.0'])
-    def test_actualizar_precio_exitoso(self, mock_input):
+    @patch.object(SistemaInventario, 'pausar', return_value=None)
+    def test_actualizar_precio_exitoso(self, mock_pausar):
         """Test actualizar precio."""
-        from producto import Producto
         prod = Producto('TEST001', 'Test', 'Cat', 100.0, 10)
         self.sistema.inventario.agregar_producto(prod)
         
         with patch.object(self.sistema, 'obtener_entrada', side_effect=['TEST001', 150.0]):
             self.sistema.actualizar_precio()
     
-    @patch('builtins.input', return_value='Laptop')
-    def test_buscar_por_nombre(self, mock_input):
+    @patch.object(SistemaInventario, 'pausar', return_value=None)
+    def test_buscar_por_nombre(self, mock_pausar):
         """Test buscar por nombre."""
         with patch.object(self.sistema, 'obtener_entrada', return_value='Laptop'):
             self.sistema.buscar_por_nombre()
     
-    @patch('builtins.input', return_value='Electronica')
-    def test_buscar_por_categoria(self, mock_input):
+    @patch.object(SistemaInventario, 'pausar', return_value=None)
+    def test_buscar_por_categoria(self, mock_pausar):
         """Test buscar por categoría."""
         with patch.object(self.sistema, 'obtener_entrada', return_value='Electronica'):
             self.sistema.buscar_por_categoria()
@@ -88,6 +80,16 @@ class TestSistemaInventarioCompleto(unittest.TestCase):
         with patch('builtins.input', return_value=''):
             self.sistema.mostrar_todos_productos()
     
+    @patch('main._TAMANO_LOTE_LISTADO', 2)
+    def test_mostrar_productos_por_lotes(self):
+        """Test listado escrito en lotes, una línea por producto."""
+        productos = [Producto(f'L{i}', f'Prod {i}', 'Cat', 1.0, i) for i in range(5)]
+        with patch('sys.stdout.write') as mock_write:
+            self.sistema._mostrar_productos(productos)
+        self.assertEqual(mock_write.call_count, 3)
+        texto = ''.join(llamada.args[0] for llamada in mock_write.call_args_list)
+        self.assertEqual(texto.splitlines(), [str(p) for p in productos])
+    
     def test_reporte_stock_bajo(self):
         """Test reporte stock bajo."""
         with patch('builtins.input', return_value=''):
@@ -103,8 +105,8 @@ class TestSistemaInventarioCompleto(unittest.TestCase):
         with patch('builtins.input', return_value=''):
             self.sistema.estadisticas_inventario()
     
-    @patch('builtins.input', return_value='15')
-    def test_configurar_umbral_stock(self, mock_input):
+    @patch.object(SistemaInventario, 'pausar', return_value=None)
+    def test_configurar_umbral_stock(self, mock_pausar):
         """Test configurar umbral."""
         with patch.object(self.sistema, 'obtener_entrada', return_value=15):
             self.sistema.configurar_umbral_stock()
@@ -120,14 +122,34 @@ class TestSistemaInventarioCompleto(unittest.TestCase):
             resultado = self.sistema.obtener_entrada("Test:", int, {'minimo': 50})
             self.assertEqual(resultado, 100)
     
+    def test_obtener_entrada_numeros_no_finitos_reintenta(self):
+        """Rechaza 'nan', 'inf' y desbordamientos y acepta notación científica."""
+        with patch('builtins.print'), patch('builtins.input', side_effect=['nan', 'inf', '1e400', '1e2']):
+            resultado = self.sistema.obtener_entrada("Precio:", float, {'minimo': 0.01})
+            self.assertEqual(resultado, 100.0)
+    
+    def test_obtener_entrada_acepta_separadores_de_digitos(self):
+        """Acepta '_' entre dígitos igual que int() y float()."""
+        with patch('builtins.input', return_value='1_000'):
+            self.assertEqual(self.sistema.obtener_entrada("Cantidad:", int), 1000)
+        with patch('builtins.input', return_value='1_000.5'):
+            self.assertEqual(self.sistema.obtener_entrada("Precio:", float), 1000.5)
+    
     def test_validar_string_seguro_multiples_patrones(self):
         """Test múltiples patrones peligrosos."""
-        self.assertFalse(self.sistema._validar_string_seguro("<iframe src='malicious'>"))
-        self.assertFalse(self.sistema._validar_string_seguro("javascript:void(0)"))
-        self.assertFalse(self.sistema._validar_string_seguro("vbscript:msgbox"))
-        self.assertFalse(self.sistema._validar_string_seguro("data:text/html,<script>"))
-        self.assertFalse(self.sistema._validar_string_seguro("file:///etc/passwd"))
-        self.assertTrue(self.sistema._validar_string_seguro("texto normal"))
+        casos = [
+            ("<iframe src='malicious'>", False),
+            ("javascript:void(0)", False),
+            ("vbscript:msgbox", False),
+            ("data:text/html,<script>", False),
+            ("file:///etc/passwd", False),
+            ("texto normal", True),
+            ("Laptop 15.6, modelo X-200_b", True),
+            ("../etc", False),
+        ]
+        for texto, esperado in casos:
+            with self.subTest(texto=texto):
+                self.assertIs(self.sistema._validar_string_seguro(texto), esperado)
 
     @patch.object(SistemaInventario, 'pausar', return_value=None)
     @patch('builtins.print')
@@ -196,6 +218,21 @@ class TestSistemaInventarioCompleto(unittest.TestCase):
         resultado = self.sistema.ejecutar()
         self.assertIsNone(resultado)
 
+    @patch('builtins.input', side_effect=EOFError)
+    def test_ejecutar_termina_con_fin_de_entrada(self, mock_input):
+        """Cubre la salida limpia de ejecutar() cuando se agota la entrada estándar."""
+        with patch('builtins.print'), patch.object(self.sistema, 'limpiar_pantalla'):
+            resultado = self.sistema.ejecutar()
+        self.assertIsNone(resultado)
+
+    def test_limpiar_pantalla_con_ansi(self):
+        """Con terminal compatible se escribe la secuencia ANSI sin lanzar procesos."""
+        self.sistema._limpiar_con_ansi = True
+        with patch('sys.stdout.write') as mock_write, patch('subprocess.run') as mock_run:
+            self.sistema.limpiar_pantalla()
+        mock_write.assert_called_once_with("\x1b[2J\x1b[H")
+        mock_run.assert_not_called()
+
     def test_sanitizar_entrada_varios_casos(self):
         """Prueba sanitización de diferentes entradas."""
         self.assertEqual(self.sistema._sanitizar_entrada("  Hola  "), "  Hola  ")
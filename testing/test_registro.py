@@ -0,0 +1,40 @@
+import unittest
+import os
+from unittest.mock import patch
+from registro import configurar_logger
+from testing.directorio_temporal import DirectorioTemporalMixin
+
+
+class TestConfigurarLogger(DirectorioTemporalMixin, unittest.TestCase):
+    """
+    Tests para la configuración de los loggers de errores.
+    """
+    
+    def test_logger_escribe_en_el_archivo_al_primer_mensaje(self):
+        """El archivo de log se crea con el primer mensaje y lo recibe sin esperar a vaciar nada."""
+        archivo_log = self.ruta_temporal(".log")
+        with patch('sys.stderr'):
+            # El handler de consola toma sys.stderr al crearse: se crea ya silenciado
+            logger = configurar_logger(f"test.{self._testMethodName}", archivo_log)
+            for handler in logger.handlers:
+                self.addCleanup(handler.close)
+            
+            self.assertFalse(os.path.exists(archivo_log))
+            logger.error("fallo grave")
+        with open(archivo_log, encoding='utf-8') as f:
+            self.assertIn("fallo grave", f.read())
+
+    def test_configurar_logger_no_duplica_handlers(self):
+        """Configurar dos veces el mismo logger no añade handlers nuevos."""
+        with patch('sys.stderr'):
+            logger = configurar_logger(f"test.{self._testMethodName}", self.ruta_temporal(".log"))
+            for handler in logger.handlers:
+                self.addCleanup(handler.close)
+            handlers = list(logger.handlers)
+            
+            self.assertIs(configurar_logger(logger.name, self.ruta_temporal(".log")), logger)
+        self.assertEqual(logger.handlers, handlers)
+
+
+if __name__ == '__main__':
+    unittest.main()
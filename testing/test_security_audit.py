@@ -1,3 +1,4 @@
+import io
 import os
 import json     
 import pytest
@@ -27,54 +28,69 @@ def temp_python_file(tmp_path):
 # TESTS DE DETECCIÓN DE VULNERABILIDADES
 # ------------------------------
 
-def test_detecta_os_system(auditor, temp_python_file):
-    temp_python_file.write_text("import os\nos.system('ls')\n")
-    auditor._analizar_archivo_python(temp_python_file)
-    assert any(v['tipo'] == 'COMMAND_INJECTION' for v in auditor.vulnerabilidades)
-
-def test_detecta_eval_exec(auditor, temp_python_file):
-    temp_python_file.write_text("eval('2+2')\nexec('print(123)')\n")
-    auditor._analizar_archivo_python(temp_python_file)
-    tipos = [v['tipo'] for v in auditor.vulnerabilidades]
-    assert "CODE_INJECTION" in tipos
-
-def test_detecta_path_traversal(auditor, temp_python_file):
-    temp_python_file.write_text("open('../etc/passwd')\n")
-    auditor._analizar_archivo_python(temp_python_file)
-    assert any(v['tipo'] == 'PATH_TRAVERSAL' for v in auditor.vulnerabilidades)
-
-def test_detecta_secreto_hardcodeado(auditor, temp_python_file):
-    temp_python_file.write_text("password = '1234'\n")
-    auditor._analizar_archivo_python(temp_python_file)
-    assert any(v['tipo'] == 'HARDCODED_SECRET' for v in auditor.vulnerabilidades)
-
-def test_detecta_criptografia_debil(auditor, temp_python_file):
-    temp_python_file.write_text("import hashlib\nhashlib.md5(b'data')\n")
-    auditor._analizar_archivo_python(temp_python_file)
-    assert any(v['tipo'] == 'WEAK_CRYPTO' for v in auditor.vulnerabilidades)
-
-def test_detecta_sql_injection(auditor, temp_python_file):
-    temp_python_file.write_text("cursor.execute('SELECT * FROM users WHERE id=%s' % user_id)\n")
-    auditor._analizar_archivo_python(temp_python_file)
-    assert any(v['tipo'] == 'SQL_INJECTION' for v in auditor.vulnerabilidades)
-
-def test_detecta_xss(auditor, temp_python_file):
-    temp_python_file.write_text("document.write('<script>alert(1)</script>')\n")
-    auditor._analizar_archivo_python(temp_python_file)
-    assert any(v['tipo'] == 'XSS' for v in auditor.vulnerabilidades)
+# Fragmento de código -> tipo de vulnerabilidad que debe detectarse en él
+_FRAGMENTOS_VULNERABLES = {
+    "os_system": ("import os\nos.system('ls')\n", 'COMMAND_INJECTION'),
+    "eval_exec": ("eval('2+2')\nexec('print(123)')\n", 'CODE_INJECTION'),
+    "path_traversal": ("open('../etc/passwd')\n", 'PATH_TRAVERSAL'),
+    "secreto_hardcodeado": ("password = '1234'\n", 'HARDCODED_SECRET'),
+    "criptografia_debil": ("import hashlib\nhashlib.md5(b'data')\n", 'WEAK_CRYPTO'),
+    "sql_injection": ("cursor.execute('SELECT * FROM users WHERE id=%s' % user_id)\n", 'SQL_INJECTION'),
+    "xss": ("document.write('<script>alert(1)</script>')\n", 'XSS'),
+}
+
+@pytest.fixture(scope="module")
+def tipos_por_fragmento(tmp_path_factory):
+    """Analiza una sola vez cada fragmento, en su propio archivo y con su propio auditor."""
+    directorio = tmp_path_factory.mktemp("fragmentos")
+    tipos = {}
+    for nombre, (codigo, _) in _FRAGMENTOS_VULNERABLES.items():
+        archivo = directorio / f"{nombre}.py"
+        archivo.write_text(codigo)
+        auditor = AuditoriaSeguridad()
+        auditor.analizar_archivo_python(archivo)
+        tipos[nombre] = [v['tipo'] for v in auditor.vulnerabilidades]
+    return tipos
+
+@pytest.mark.parametrize("nombre", list(_FRAGMENTOS_VULNERABLES))
+def test_detecta_vulnerabilidad(tipos_por_fragmento, nombre):
+    assert _FRAGMENTOS_VULNERABLES[nombre][1] in tipos_por_fragmento[nombre]
+
+def test_eval_se_reporta_una_sola_vez(auditor, temp_python_file):
+    temp_python_file.write_text("eval('2+2')\n")
+    auditor.analizar_archivo_python(temp_python_file)
+    assert [v['tipo'] for v in auditor.vulnerabilidades] == ['CODE_INJECTION']
+
+def test_secretos_solapados_se_cuentan_por_patron(auditor, temp_python_file):
+    # Igual que con un finditer por patrón: el token dentro del valor de secret también se reporta
+    temp_python_file.write_text("secret = \"token = 'abc'\"\n")
+    auditor.analizar_archivo_python(temp_python_file)
+    assert [v['codigo'] for v in auditor.vulnerabilidades] == [
+        "secret = \"token = '", "token = 'abc'"
+    ]
+
+def test_lineas_de_vulnerabilidades(auditor, temp_python_file):
+    temp_python_file.write_text("x = 1\neval('1')\n\ncursor.execute('%s' % a)\nos.system('ls')\n")
+    auditor.analizar_archivo_python(temp_python_file)
+    lineas = {(v['tipo'], v['linea']) for v in auditor.vulnerabilidades}
+    assert ('CODE_INJECTION', 2) in lineas
+    assert ('SQL_INJECTION', 4) in lineas
+    assert ('COMMAND_INJECTION', 5) in lineas
+    # execute( dentro de cursor.execute( se sigue reportando por separado
+    assert sum(1 for v in auditor.vulnerabilidades if v['tipo'] == 'SQL_INJECTION') == 2
 
 # ------------------------------
 # TESTS DE CONFIGURACIONES
 # ------------------------------
 
-def test_verifica_env_file(auditor, tmp_path):
+def test_verifica_env_file(monkeypatch, auditor, tmp_path):
     (tmp_path / ".env").write_text("SECRET=123")
-    os.chdir(tmp_path)
+    monkeypatch.chdir(tmp_path)
     auditor._verificar_configuraciones()
     assert any(v['tipo'] == 'SENSITIVE_FILE' for v in auditor.vulnerabilidades)
 
-def test_verifica_falta_gitignore(auditor, tmp_path):
-    os.chdir(tmp_path)
+def test_verifica_falta_gitignore(monkeypatch, auditor, tmp_path):
+    monkeypatch.chdir(tmp_path)
     auditor._verificar_configuraciones()
     assert any(v['tipo'] == 'MISSING_GITIGNORE' for v in auditor.vulnerabilidades)
 
@@ -84,24 +100,54 @@ def test_verifica_falta_gitignore(auditor, tmp_path):
 
 def test_analizar_dependencias_vulnerables(monkeypatch, auditor, tmp_path):
     (tmp_path / "requirements.txt").write_text("flask==1.0")
-    os.chdir(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    llamadas = []
 
     def fake_run(*args, **kwargs):
+        llamadas.append(args)
         return subprocess.CompletedProcess(args, returncode=1, stdout="Vulnerable package found")
 
-    monkeypatch.setattr(subprocess, "run", fake_run)
+    monkeypatch.setattr("security_audit.subprocess.run", fake_run)
     auditor._analizar_dependencias()
+    assert len(llamadas) == 1
     assert any(v['tipo'] == 'VULNERABLE_DEPENDENCY' for v in auditor.vulnerabilidades)
 
+def test_auditoria_completa_ejecuta_safety_en_segundo_plano(monkeypatch, auditor, tmp_path):
+    (tmp_path / "requirements.txt").write_text("flask==1.0")
+    monkeypatch.chdir(tmp_path)
+
+    def fake_run(*args, **kwargs):
+        return subprocess.CompletedProcess(args, returncode=1, stdout="Vulnerable package found")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    monkeypatch.setattr("builtins.print", lambda *a, **k: None)
+    reporte = auditor.ejecutar_auditoria_completa()
+    assert any(v['tipo'] == 'VULNERABLE_DEPENDENCY' for v in reporte['vulnerabilidades'])
+
+def test_safety_no_instalado_no_se_reintenta(monkeypatch, auditor, tmp_path):
+    (tmp_path / "requirements.txt").write_text("flask==1.0")
+    monkeypatch.chdir(tmp_path)
+    llamadas = []
+
+    def fake_run(*args, **kwargs):
+        llamadas.append(args)
+        raise FileNotFoundError("safety")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    auditor._analizar_dependencias()
+    auditor._analizar_dependencias()
+    assert len(llamadas) == 1
+    assert not any(v['tipo'] == 'VULNERABLE_DEPENDENCY' for v in auditor.vulnerabilidades)
+
 # ------------------------------
 # TESTS DE PERMISOS
 # ------------------------------
 
-def test_permisos_inseguros(auditor, tmp_path):
+def test_permisos_inseguros(monkeypatch, auditor, tmp_path):
     file = tmp_path / ".env"
     file.write_text("SECRET=123")
     file.chmod(0o666)  # permisos inseguros
-    os.chdir(tmp_path)
+    monkeypatch.chdir(tmp_path)
     auditor._verificar_permisos()
     assert any(v['tipo'] == 'INSECURE_PERMISSIONS' for v in auditor.vulnerabilidades)
 
@@ -117,6 +163,8 @@ def test_generar_reporte_y_recomendaciones(auditor):
     assert "resumen" in reporte
     assert "recomendaciones" in reporte
     assert reporte['resumen']['criticas'] == 1
+    assert auditor.vulnerabilidades_por_severidad['CRITICA'] == auditor.vulnerabilidades
+    assert auditor.vulnerabilidades_por_severidad['BAJA'] == []
 
 def test_guardar_reporte(auditor, tmp_path):
     file = tmp_path / "reporte.json"
@@ -128,13 +176,38 @@ def test_guardar_reporte(auditor, tmp_path):
     data = json.loads(file.read_text())
     assert "resumen" in data
 
+def test_guardar_reporte_en_objeto_de_texto(auditor, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    buffer = io.StringIO()
+    auditor.guardar_reporte(buffer)
+    assert json.loads(buffer.getvalue())['resumen']['total_vulnerabilidades'] == 0
+    assert not any(tmp_path.iterdir())
+
+def test_guardar_reporte_ya_generado(auditor, tmp_path, monkeypatch):
+    file = tmp_path / "reporte.json"
+    reporte = auditor._generar_reporte()
+
+    def no_regenerar():
+        raise AssertionError("el reporte no debe generarse de nuevo")
+
+    monkeypatch.setattr(auditor, "_generar_reporte", no_regenerar)
+    auditor.guardar_reporte(str(file), reporte=reporte)
+    assert json.loads(file.read_text())['resumen'] == reporte['resumen']
+
 # ------------------------------
 # TEST DE MAIN
 # ------------------------------
 
 def test_main(monkeypatch, tmp_path):
     (tmp_path / "dummy.py").write_text("print('hola')\n")
-    os.chdir(tmp_path)
+    monkeypatch.chdir(tmp_path)
 
     monkeypatch.setattr("builtins.print", lambda *a, **k: None)  # silenciar salida
+
+    def sin_procesos(*args, **kwargs):
+        raise AssertionError("sin requirements.txt no debe lanzarse safety")
+
+    monkeypatch.setattr("security_audit.subprocess.run", sin_procesos)
     main()  # debe ejecutarse sin errores
+    # El análisis y el reporte quedan confinados al directorio temporal
+    assert (tmp_path / "security_audit_report.json").exists()